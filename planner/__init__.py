@@ -1 +1 @@
-from planner.planners import SimplePlanner, HeuristicLBBDPlanner, VanillaLBBDPlanner
+from planner.planners import SimplePlanner, LNSPlanner, ReplanningPlanner, HeuristicLBBDPlanner, VanillaLBBDPlanner
@@ -1,7 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 import math
-from scipy.stats import binom
-from scipy.stats import uniform
 import numpy as np
 import planner.sample_data as sd
 
@@ -41,8 +40,13 @@ class SurgeryType(Enum):
 
 
 class DataMaker:
+
+    # part of the instance cache key: instances drawn by an older sampling scheme are not reused
+    SAMPLING_VERSION = 2
+
+    # seed can be an int or a numpy.random.SeedSequence: each DataMaker draws from its own generator, not from the global state
     def __init__(self, seed, data_descriptor: DataDescriptor):
-        np.random.seed(seed=seed)
+        self.random = np.random.default_rng(seed)
         self.data_descriptor = data_descriptor
 
         self.origin_wards = self.draw_origin_wards()
@@ -57,12 +61,11 @@ class DataMaker:
         self.arrival_delays = self.compute_arrival_delays()
 
     def generate_uniform_sample(self, patients, lower, upper):
-        uniformDistribution = uniform(loc=lower, scale=upper - lower)
-        sample = uniformDistribution.rvs(patients)
+        sample = self.random.uniform(lower, upper, size=patients)
         return sample
 
     def generate_binomial_sample(self, patients, p, isSpecialty):
-        sample = binom.rvs(1, p, size=patients)
+        sample = self.random.binomial(1, p, size=patients)
         if(isSpecialty):
             sample = sample + 1
         return sample
@@ -73,22 +76,6 @@ class DataMaker:
             dict[(i + 1)] = sample[i]
         return dict
 
-    def generate_u_parameter(self):
-        dict = {}
-        for i1 in range(1, len(self.precedences) + 1):
-            for i2 in range(1, len(self.precedences) + 1):
-                dict[(i1, i2)] = 0
-                dict[(i2, i1)] = 0
-                if(i1 == i2):
-                    continue
-                if(self.precedences[i1 - 1] < self.precedences[i2 - 1]):
-                    dict[(i1, i2)] = 1
-                    continue
-                if(self.precedences[i2 - 1] < self.precedences[i1 - 1]):
-                    dict[(i2, i1)] = 1
-                    continue
-        return dict
-
     def generate_data(self, data_descriptor: DataDescriptor):
         return self.create_data_dictionary(data_descriptor)
 
@@ -115,41 +102,32 @@ class DataMaker:
                 precedences.append(5)
         return precedences
 
+    # inverse-CDF sampling: each draw gets the first category whose cumulative frequency reaches it,
+    # or the last category if rounding leaves the draw above all of them
+    def draw_categories(self, categories, frequencies, draws):
+        cumulative_sum = np.cumsum(frequencies)
+        indices = np.minimum(np.searchsorted(cumulative_sum, draws, side='left'), len(categories) - 1)
+        return np.array(categories, dtype=object)[indices]
+
     def draw_origin_wards(self):
-        origin_ward_ids = list(
-            self.data_descriptor.ward_frequency_mapping.keys())
-        origin_ward_ids_frequencies = list(
-            self.data_descriptor.ward_frequency_mapping.values())
-        cumulativeSum = np.cumsum(origin_ward_ids_frequencies)
-        draws = uniform.rvs(size=self.data_descriptor.patients)
-        origin_wards = [""] * self.data_descriptor.patients
-        for i in range(0, len(draws)):
-            for j in range(0, len(cumulativeSum)):
-                if(draws[i] <= cumulativeSum[j]):
-                    origin_wards[i] = origin_ward_ids[j]
-                    break
-            if(origin_wards[i] == ""):
-                origin_wards[i] = origin_ward_ids[-1]
-        return origin_wards
+        draws = self.random.random(size=self.data_descriptor.patients)
+        return self.draw_categories(list(self.data_descriptor.ward_frequency_mapping.keys()),
+                                    list(self.data_descriptor.ward_frequency_mapping.values()),
+                                    draws).tolist()
 
     def draw_operations_given_origin_ward(self):
         n = len(self.origin_wards)
-        draws = uniform.rvs(size=n)
-        operations = []
-        for i in range(0, n):
-            surgery_ids = list(self.data_descriptor.surgery_frequency_given_ward_mapping[self.origin_wards[i]].keys())
-            surgeryIdsFrequencies = list(self.data_descriptor.surgery_frequency_given_ward_mapping[self.origin_wards[i]].values())
-            cumulativeSum = np.cumsum(surgeryIdsFrequencies)
-            times = np.zeros(n) - 1
-            for j in range(0, len(cumulativeSum)):
-                if(draws[i] <= cumulativeSum[j]):
-                    times[i] = self.data_descriptor.surgery_room_occupancy_mapping[surgery_ids[j]]
-                    operations.append(surgery_ids[j])
-                    break
-            if(times[i] == -1):
-                times[i] = self.data_descriptor.surgery_room_occupancy_mapping[surgery_ids[-1]]
-                operations.append(surgery_ids[-1])
-        return operations
+        draws = self.random.random(size=n)
+        operations = np.empty(n, dtype=object)
+        # patients coming from the same ward share the same CDF, hence are sampled together
+        wards, ward_indices = np.unique(np.array(self.origin_wards), return_inverse=True)
+        for w, ward in enumerate(wards):
+            patients = ward_indices == w
+            surgery_frequencies = self.data_descriptor.surgery_frequency_given_ward_mapping[str(ward)]
+            operations[patients] = self.draw_categories(list(surgery_frequencies.keys()),
+                                                        list(surgery_frequencies.values()),
+                                                        draws[patients])
+        return operations.tolist()
 
     def compute_operating_times(self):
         times = []
@@ -187,18 +165,10 @@ class DataMaker:
                                              isSpecialty=False)
 
     def draw_specialties(self):
-        specialty_frequency_cumulative_sum = np.cumsum(
-            self.data_descriptor.specialty_frequency)
-        draws = uniform.rvs(size=self.data_descriptor.patients)
-        specialties = [""] * self.data_descriptor.patients
-        for i in range(0, len(draws)):
-            for j in range(0, len(specialty_frequency_cumulative_sum)):
-                if(draws[i] <= specialty_frequency_cumulative_sum[j]):
-                    specialties[i] = self.data_descriptor.specialties[j]
-                    break
-            if(specialties[i] == ""):
-                specialties[i] = self.data_descriptor.specialties[-1]
-        return specialties
+        draws = self.random.random(size=self.data_descriptor.patients)
+        return self.draw_categories(self.data_descriptor.specialties,
+                                    self.data_descriptor.specialty_frequency,
+                                    draws).tolist()
 
     def generate_tau_parameters(self):
         specialty_table = self.data_descriptor.operating_room_specialty_table
@@ -250,7 +220,6 @@ class DataMaker:
                 'r': self.create_dictionary_entry(self.priorities),
                 'a': self.create_dictionary_entry(self.anesthesia_flags),
                 'c': self.create_dictionary_entry(self.infection_flags),
-                'u': self.generate_u_parameter(),
                 'patientId': self.create_dictionary_entry([i for i in range(1, self.data_descriptor.patients + 1)]),
                 'specialty': self.create_dictionary_entry(self.specialties),
                 'precedence': self.create_dictionary_entry(self.precedences),
@@ -288,3 +257,15 @@ class DataMaker:
                           delay="N/A"
                           ))
         print("\n")
+
+
+def make_data_dictionary(seed, data_descriptor):
+    return DataMaker(seed=seed, data_descriptor=data_descriptor).create_data_dictionary()
+
+
+# one instance for each descriptor, drawn from the children of SeedSequence(seed):
+# the i-th instance only depends on seed and i, whatever the number of workers
+def make_data_dictionaries(seed, data_descriptors, workers=None):
+    seeds = np.random.SeedSequence(seed).spawn(len(data_descriptors))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(make_data_dictionary, seeds, data_descriptors))
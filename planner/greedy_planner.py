@@ -1,10 +1,7 @@
-from bisect import bisect
-import copy
-from enum import unique
-from re import I
-from select import select
-from turtle import update
-from model import Patient
+from math import inf
+from planner.model import PatientTable
+from planner.slot_index import FirstFitIndex, BestFitIndex, GapIndex
+from planner.interval_scheduling import IntervalScheduler
 
 
 class Planner:
@@ -30,27 +27,13 @@ class Planner:
                 self.roomAnesthetistPresence[(k, t)] = []
 
     def create_patients_list(self):
-        self.patients = []
-        for i in range(1, self.dataDictionary[None]["I"][None] + 1):
-            self.patients.append(Patient(id=i,
-                                         priority=self.dataDictionary[None]["r"][i],
-                                         room=0,
-                                         specialty=self.dataDictionary[None]["specialty"][i],
-                                         day=0,
-                                         operatingTime=self.dataDictionary[None]["p"][i],
-                                         covid=self.dataDictionary[None]["c"][i],
-                                         precedence=self.dataDictionary[None]["precedence"][i],
-                                         delayWeight=None,
-                                         anesthesia=self.dataDictionary[None]["a"][i],
-                                         anesthetist=0,
-                                         order=0)
-                                 )
+        self.patient_table = PatientTable.from_data_dictionary(self.dataDictionary)
         # sort patients by r_i * d_i / p_i (non-decreasing order): get the most bang for your buck, while considering delay weight
-        self.patients.sort(key=lambda x: x.priority / x.operatingTime, reverse=True)
+        self.patients = self.patient_table.patients(self.patient_table.ratio_order())
 
     # fill rooms, for each day
     def fill_rooms(self):
-        tmpPatients = []
+        tmpPatients = set()
         for t in range(1, self.dataDictionary[None]["T"][None] + 1):
             for k in range(1, self.dataDictionary[None]["K"][None] + 1):
                 self.solution[(k, t)] = []
@@ -59,50 +42,56 @@ class Planner:
                     if(self.roomSpecialtyMapping[k] == patient.specialty and patient.operatingTime <= roomCapacity):
                         self.solution[(k, t)].append(patient)
                         roomCapacity = roomCapacity - patient.operatingTime
-                        tmpPatients.append(patient.id)
+                        tmpPatients.add(patient.id)
                 self.patients = [p for p in self.patients if p.id not in tmpPatients]
 
-    def fill_rooms_first_fit(self):
-        roomCapacities = copy.deepcopy(self.dataDictionary[None]["s"])
+    # one index per specialty, over the residual capacities of its (k, t) slots in scan order (by day, then by room)
+    def create_slot_indices(self, indexClass, roomCapacities):
+        specialtySlots = {}
+        for t in range(1, self.dataDictionary[None]["T"][None] + 1):
+            for k in range(1, self.dataDictionary[None]["K"][None] + 1):
+                specialtySlots.setdefault(self.roomSpecialtyMapping[k], []).append((k, t))
+        return {j: indexClass(slots, [roomCapacities[slot] for slot in slots]) for j, slots in specialtySlots.items()}
+
+    def create_empty_solution(self):
         for t in range(1, self.dataDictionary[None]["T"][None] + 1):
             for k in range(1, self.dataDictionary[None]["K"][None] + 1):
                 self.solution[(k, t)] = []
 
+    # residual capacity of each (k, t) slot, given the patients already in the solution
+    def compute_residual_capacities(self):
+        return {(k, t): self.dataDictionary[None]["s"][(k, t)] - sum(p.operatingTime for p in self.solution[(k, t)])
+                for k in range(1, self.dataDictionary[None]["K"][None] + 1)
+                for t in range(1, self.dataDictionary[None]["T"][None] + 1)}
+
+    def fill_rooms_first_fit(self):
+        self.create_empty_solution()
+        slotIndices = self.create_slot_indices(FirstFitIndex, self.dataDictionary[None]["s"])
+
         tmpPatients = []
         for patient in self.patients:
-            assigned = False
-            for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    if(self.roomSpecialtyMapping[k] == patient.specialty and patient.operatingTime <= roomCapacities[(k, t)]):
-                        self.solution[(k, t)].append(patient)
-                        roomCapacities[(k, t)] = roomCapacities[(k, t)] - patient.operatingTime
-                        assigned = True
-                    if(assigned):
-                        break
-                if(assigned):
-                    break
-            if(not assigned):
+            slot = None
+            if(patient.specialty in slotIndices):
+                slot = slotIndices[patient.specialty].first_fit(patient.operatingTime)
+            if(slot):
+                self.solution[slot].append(patient)
+                slotIndices[patient.specialty].reduce(slot, patient.operatingTime)
+            else:
                 tmpPatients.append(patient)
         self.patients = tmpPatients
 
     def fill_rooms_best_fit(self):
-        roomCapacities = copy.deepcopy(self.dataDictionary[None]["s"])
-        for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-            for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                self.solution[(k, t)] = []
+        self.create_empty_solution()
+        slotIndices = self.create_slot_indices(BestFitIndex, self.dataDictionary[None]["s"])
 
         tmpPatients = []
         for patient in self.patients:
-            bestSlot = (0,0)
-            minimumResidual = 99999999
-            for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    if(self.roomSpecialtyMapping[k] == patient.specialty and patient.operatingTime <= roomCapacities[(k, t)] and roomCapacities[(k, t)] - patient.operatingTime < minimumResidual):
-                        minimumResidual = roomCapacities[(k, t)] - patient.operatingTime
-                        bestSlot = (k, t)
-            if(bestSlot != (0, 0)):
-                self.solution[bestSlot].append(patient)
-                roomCapacities[bestSlot] = minimumResidual
+            slot = None
+            if(patient.specialty in slotIndices):
+                slot = slotIndices[patient.specialty].best_fit(patient.operatingTime)
+            if(slot):
+                self.solution[slot].append(patient)
+                slotIndices[patient.specialty].reduce(slot, patient.operatingTime)
             else:
                 tmpPatients.append(patient)
         self.patients = tmpPatients
@@ -188,46 +177,31 @@ class Planner:
                 self.patients = tmpPatients
 
     def fill_discarded_slots_first_fit(self):
-        roomCapacities = copy.deepcopy(self.dataDictionary[None]["s"])
-        for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-            for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                roomCapacities[(k, t)] = self.dataDictionary[None]["s"][(k, t)] - sum(p.operatingTime for p in self.solution[(k, t)])
+        slotIndices = self.create_slot_indices(FirstFitIndex, self.compute_residual_capacities())
 
         tmpPatients = []
         for patient in self.patients:
-            assigned = False
-            for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    if(patient.anesthesia == 0 and self.roomSpecialtyMapping[k] == patient.specialty and patient.operatingTime <= roomCapacities[(k, t)]):
-                        self.solution[(k, t)].append(patient)
-                        roomCapacities[(k, t)] = roomCapacities[(k, t)] - patient.operatingTime
-                        assigned = True
-                    if(assigned):
-                        break
-                if(assigned):
-                    break
-            if(not assigned):
+            slot = None
+            if(patient.anesthesia == 0 and patient.specialty in slotIndices):
+                slot = slotIndices[patient.specialty].first_fit(patient.operatingTime)
+            if(slot):
+                self.solution[slot].append(patient)
+                slotIndices[patient.specialty].reduce(slot, patient.operatingTime)
+            else:
                 tmpPatients.append(patient)
         self.patients = tmpPatients
 
     def fill_discarded_slots_best_fit(self):
-        roomCapacities = copy.deepcopy(self.dataDictionary[None]["s"])
-        for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-            for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                roomCapacities[(k, t)] = self.dataDictionary[None]["s"][(k, t)] - sum(p.operatingTime for p in self.solution[(k, t)])
+        slotIndices = self.create_slot_indices(BestFitIndex, self.compute_residual_capacities())
 
         tmpPatients = []
         for patient in self.patients:
-            bestSlot = (0,0)
-            minimumResidual = 99999999
-            for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    if(self.roomSpecialtyMapping[k] == patient.specialty and patient.operatingTime <= roomCapacities[(k, t)] and roomCapacities[(k, t)] - patient.operatingTime < minimumResidual):
-                        minimumResidual = roomCapacities[(k, t)] - patient.operatingTime
-                        bestSlot = (k, t)
-            if(bestSlot != (0, 0)):
-                self.solution[bestSlot].append(patient)
-                roomCapacities[bestSlot] = roomCapacities[bestSlot] - patient.operatingTime
+            slot = None
+            if(patient.specialty in slotIndices):
+                slot = slotIndices[patient.specialty].best_fit(patient.operatingTime)
+            if(slot):
+                self.solution[slot].append(patient)
+                slotIndices[patient.specialty].reduce(slot, patient.operatingTime)
             else:
                 tmpPatients.append(patient)
         self.patients = tmpPatients
@@ -281,41 +255,28 @@ class Planner:
                     value = value + p.priority
         return value
 
+    # value of the objective of the MIP models, for comparison with them: no delays are planned, so only the priority term counts
+    def compute_MIP_objective_value(self):
+        priorities = self.dataDictionary[None]["r"]
+        return self.compute_objective_value() / sum(priorities.values())
+
     def extract_solution(self):
         return self.solution
 
     # for now, pretend anesthetist has the same span of operating room time
+    # all the anesthetists of a day are assigned at once, maximising the priority of the patients who get one
     def select_non_overlapping(self):
-        for a in range(1, self.dataDictionary[None]["A"][None] + 1):
-            for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                anesthesiaPatients = []
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    for p in self.solution[(k, t)]:
-                        if(p.anesthesia == 1 and p.anesthetist == 0):
-                            anesthesiaPatients.append(p)
-
-                if(anesthesiaPatients == []):
-                    continue
-                anesthesiaPatients.sort(key=lambda x: x.order + x.operatingTime)
-                pValues = [bisect(list(map((lambda ap: ap.order + ap.operatingTime), anesthesiaPatients)), patient.order) - 1 for patient in anesthesiaPatients]
-                optima = [0 for _ in anesthesiaPatients]
-                optima[0] = anesthesiaPatients[0].priority
-
-                for i in range(1, len(anesthesiaPatients)):
-                    optPi = 0
-                    if(pValues[i] != -1):
-                        optPi = optima[pValues[i]]
-                    optima[i] = max(anesthesiaPatients[i].priority + optPi, optima[i - 1])
-
-                selected = self.find_solution(len(anesthesiaPatients) - 1, anesthesiaPatients, pValues, optima)
+        scheduler = IntervalScheduler(self.dataDictionary[None]["A"][None])
+        for t in range(1, self.dataDictionary[None]["T"][None] + 1):
+            anesthesiaPatients = []
+            for k in range(1, self.dataDictionary[None]["K"][None] + 1):
+                for p in self.solution[(k, t)]:
+                    if(p.anesthesia == 1 and p.anesthetist == 0):
+                        anesthesiaPatients.append(p)
 
-                for k in range(1, self.dataDictionary[None]["K"][None] + 1):
-                    updatedSolution = []
-                    for p in self.solution[(k, t)]:
-                        if(p.id in selected):
-                            p.anesthetist = a
-                        updatedSolution.append(p)
-                    self.solution[(k, t)] = updatedSolution
+            assignment = scheduler.schedule([(p.order, p.order + p.operatingTime, p.priority) for p in anesthesiaPatients])
+            for p, a in zip(anesthesiaPatients, assignment):
+                p.anesthetist = a
 
     def remove_patients_without_anesthetist(self):
         for k in range(1, self.dataDictionary[None]["K"][None] + 1):
@@ -327,42 +288,35 @@ class Planner:
                 self.solution[(k, t)] = updatedSolution
 
 
-    def find_solution(self, idx, anesthesiaPatients, pValues, optima):
-        if(idx == -1):
-            return []
-        else:
-            if(anesthesiaPatients[idx].priority + optima[pValues[idx]] >= optima[idx - 1]):
-                return [anesthesiaPatients[idx].id] + self.find_solution(pValues[idx], anesthesiaPatients, pValues, optima)
-            else:
-                return self.find_solution(idx - 1, anesthesiaPatients, pValues, optima)
-
+    # fill the free time before each scheduled patient and at the end of the day with patients without anesthesia,
+    # keeping the precedence order of the room
     def fill_empty_space(self):
+        gapIndex = GapIndex([p for p in self.patients if p.anesthesia == 0])
+        selectedIds = set()
         for k in range(1, self.dataDictionary[None]["K"][None] + 1):
             for t in range(1, self.dataDictionary[None]["T"][None] + 1):
-                solutionPatients = self.solution[(k, t)]
-                selectedIds = []
-                for i in range(0, len(solutionPatients)):
-                    validPatients = []
-                    residualTime = 0
-                    previousPatientFinishing = 0
-                    if(i == 0):
-                        validPatients = list(filter(lambda p: p.precedence <= solutionPatients[i].precedence and p.anesthesia == 0, self.patients))
-                        residualTime = solutionPatients[i].order
-                    elif(i < len(solutionPatients) - 1):
-                        validPatients = list(filter(lambda p: solutionPatients[i - 1].precedence <= p.precedence and p.precedence <= solutionPatients[i].precedence and p.anesthesia == 0, self.patients))
-                        residualTime = solutionPatients[i].order - (solutionPatients[i - 1].order + solutionPatients[i - 1].operatingTime)
-                        previousPatientFinishing = solutionPatients[i - 1].order + solutionPatients[i - 1].operatingTime
-                    else:
-                        validPatients = list(filter(lambda p: solutionPatients[i].precedence <= p.precedence and p.anesthesia == 0, self.patients))
-                        residualTime = self.dataDictionary[None]["s"][(k, t)] - (solutionPatients[i].order + solutionPatients[i].operatingTime)
-                        previousPatientFinishing = solutionPatients[i].order + solutionPatients[i].operatingTime
-                    validPatients = sorted(validPatients, key=lambda x: (x.precedence, x.priority / x.operatingTime))
-                    for vp in validPatients:
-                        if(residualTime - vp.operatingTime < 0 or vp.specialty != self.roomSpecialtyMapping[k]):
-                            continue
-                        vp.order = previousPatientFinishing
-                        previousPatientFinishing = vp.order + vp.operatingTime
-                        self.solution[(k, t)].append(vp)
-                        selectedIds.append(vp.id)
-                        residualTime = residualTime - vp.operatingTime
-                self.patients = [p for p in self.patients if p.id not in selectedIds]
+                solutionPatients = sorted(self.solution[(k, t)], key=lambda p: p.order)
+                insertedPatients = []
+                previousPatientFinishing = 0
+                previousPrecedence = -inf
+                for p in solutionPatients:
+                    insertedPatients += self.fill_gap(gapIndex, k, previousPatientFinishing, p.order, previousPrecedence, p.precedence)
+                    previousPatientFinishing = p.order + p.operatingTime
+                    previousPrecedence = p.precedence
+                insertedPatients += self.fill_gap(gapIndex, k, previousPatientFinishing, self.dataDictionary[None]["s"][(k, t)], previousPrecedence, inf)
+                self.solution[(k, t)] = sorted(solutionPatients + insertedPatients, key=lambda p: p.order)
+                selectedIds.update(p.id for p in insertedPatients)
+        self.patients = [p for p in self.patients if p.id not in selectedIds]
+
+    # sequences patients from start, by non-decreasing precedence, each time the longest one which still fits before end
+    def fill_gap(self, gapIndex, k, start, end, lowestPrecedence, highestPrecedence):
+        insertedPatients = []
+        specialty = self.roomSpecialtyMapping[k]
+        for precedence in gapIndex.precedences(specialty, lowestPrecedence, highestPrecedence):
+            patient = gapIndex.pop_longest_fitting(specialty, precedence, end - start)
+            while patient:
+                patient.order = start
+                start = start + patient.operatingTime
+                insertedPatients.append(patient)
+                patient = gapIndex.pop_longest_fitting(specialty, precedence, end - start)
+        return insertedPatients
@@ -0,0 +1,62 @@
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+
+from planner.data_maker import DataMaker
+from planner.instance_io import to_arrays, from_arrays, save_instance, load_arrays
+
+
+class InstanceCache:
+    """Instances by DataDescriptor and seed: the most recently used ones are kept in memory and, if a path is given,
+    all of them on disk, in the format of planner.instance_io.
+
+    Instances are held as the arrays of planner.instance_io, memory-mapped from disk when a path is given: the
+    processes using the same cache directory (e.g. the grid workers) share their pages, and each one only builds
+    its own data dictionaries.
+    """
+
+    def __init__(self, path=None, max_size=32):
+        self.path = path
+        self.max_size = max_size
+        self.memory = OrderedDict()
+
+    # content address: any change of a descriptor field (tables included), of the seed or of the sampling scheme gives a new instance
+    def key(self, seed, data_descriptor):
+        fields = repr(sorted(vars(data_descriptor).items())) + repr(seed) + repr(DataMaker.SAMPLING_VERSION)
+        return hashlib.sha256(fields.encode()).hexdigest()
+
+    # sizes and read-only arrays of the instance, as returned by planner.instance_io.load_arrays
+    def get_arrays(self, seed, data_descriptor):
+        key = self.key(seed, data_descriptor)
+        if key in self.memory:
+            self.memory.move_to_end(key)
+        else:
+            self.memory[key] = self.load_or_make(key, seed, data_descriptor)
+            if len(self.memory) > self.max_size:
+                self.memory.popitem(last=False)
+        return self.memory[key]
+
+    # planners add their own entries to the data dictionary: each call builds a new one
+    def get(self, seed, data_descriptor):
+        return from_arrays(*self.get_arrays(seed, data_descriptor))
+
+    def load_or_make(self, key, seed, data_descriptor):
+        if self.path is None:
+            return to_arrays(DataMaker(seed=seed, data_descriptor=data_descriptor).create_data_dictionary())
+        instance_path = os.path.join(self.path, key)
+        if not os.path.exists(instance_path):
+            data = DataMaker(seed=seed, data_descriptor=data_descriptor).create_data_dictionary()
+            # written aside and renamed: processes making the same instance concurrently never see it half-written
+            temporary_path = instance_path + "." + str(os.getpid())
+            save_instance(temporary_path, data)
+            try:
+                os.rename(temporary_path, instance_path)
+            except OSError:
+                shutil.rmtree(temporary_path)
+        # the instance just made is mapped too, so that it is shared with the processes loading it later
+        return load_arrays(instance_path)
+
+
+# in-memory cache shared by the callers of the same process
+instance_cache = InstanceCache()
@@ -0,0 +1,68 @@
+import json
+import os
+
+import numpy as np
+
+# scalar sizes of an instance
+SCALARS = ['I', 'J', 'K', 'T', 'A', 'M', 'Q']
+# parameters indexed by patient only
+PATIENT_VECTORS = ['p', 'r', 'a', 'c', 'specialty', 'precedence']
+# multi-indexed parameters, with the sizes of their index sets
+TABLES = {'d': ('Q', 'I'),
+          's': ('K', 'T'),
+          'tau': ('J', 'K', 'T'),
+          'An': ('A', 'T'),
+          'Gamma': ('Q', 'K', 'T')}
+
+
+def to_arrays(data):
+    """Converts a data dictionary into its sizes and a NumPy array for each parameter (index 1 is stored at position 0).
+
+    Entries added by the planners (e.g. status, x_param) are not part of the instance and are left out.
+    """
+    data = data[None]
+    sizes = {name: data[name][None] for name in SCALARS}
+    arrays = {name: np.array([data[name][i] for i in range(1, sizes['I'] + 1)]) for name in PATIENT_VECTORS}
+    for name, dimensions in TABLES.items():
+        shape = tuple(sizes[dimension] for dimension in dimensions)
+        arrays[name] = np.array([data[name][tuple(index + 1 for index in position)] for position in np.ndindex(*shape)]).reshape(shape)
+    sizes['bigM'] = [data['bigM'][1], data['bigM'][2]]
+    return sizes, arrays
+
+
+def from_arrays(sizes, arrays):
+    """Inverse of to_arrays: builds the data dictionary expected by the planners."""
+    data = {name: {None: sizes[name]} for name in SCALARS}
+    for name in PATIENT_VECTORS:
+        data[name] = {i + 1: value for i, value in enumerate(arrays[name].tolist())}
+    for name in TABLES:
+        values = arrays[name]
+        data[name] = {tuple(index + 1 for index in position): values[position].item() for position in np.ndindex(*values.shape)}
+    data['patientId'] = {i: i for i in range(1, sizes['I'] + 1)}
+    data['bigM'] = {1: sizes['bigM'][0], 2: sizes['bigM'][1]}
+    return {None: data}
+
+
+# an instance is a directory with one .npy file per parameter, which can be memory-mapped on its own
+# (members of an .npz archive cannot)
+def save_instance(path, data):
+    sizes, arrays = to_arrays(data)
+    os.makedirs(path, exist_ok=True)
+    for name, values in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), values)
+    with open(os.path.join(path, "sizes.json"), "w") as sizes_file:
+        json.dump(sizes, sizes_file, default=lambda value: value.item())
+
+
+# memory-mapped arrays are shared through the page cache by all the processes loading the same instance
+def load_arrays(path, mmap=True):
+    with open(os.path.join(path, "sizes.json")) as sizes_file:
+        sizes = json.load(sizes_file)
+    arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None)
+              for name in PATIENT_VECTORS + list(TABLES)}
+    return sizes, arrays
+
+
+def load_instance(path):
+    """Data dictionary of an instance saved by save_instance, built from its memory-mapped arrays."""
+    return from_arrays(*load_arrays(path))
@@ -0,0 +1,84 @@
+import json
+import time
+from contextlib import contextmanager
+
+import pyomo.environ as pyo
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_memory():
+    """Peak resident set size of the process so far, in MB (None where it cannot be measured)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Instrumentation:
+    """Records wall time, CPU time and peak memory of each planner phase, and constraint counts by family."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.iteration = None
+        self.phases = []
+        self.discarded_constraints = {}
+
+    # the yielded record can be enriched with phase-specific information (e.g. the solver's own time)
+    @contextmanager
+    def phase(self, name, **info):
+        record = {"phase": name, "iteration": self.iteration}
+        record.update(info)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall_time"] = time.perf_counter() - wall_start
+            record["cpu_time"] = time.process_time() - cpu_start
+            record["peak_memory"] = peak_memory()
+            self.phases.append(record)
+
+    def count_discarded(self, family, discarded):
+        self.discarded_constraints[family] = self.discarded_constraints.get(family, 0) + discarded
+
+    def constraint_counts(self, model_instance):
+        return {constraint.name: len(constraint) for constraint in model_instance.component_objects(pyo.Constraint)}
+
+    # adds records coming from another process (e.g. a single-day SP worker)
+    def merge(self, phases, discarded_constraints, **info):
+        for record in phases:
+            record.update(info)
+            self.phases.append(record)
+        for family, discarded in discarded_constraints.items():
+            self.count_discarded(family, discarded)
+
+    def phase_totals(self):
+        totals = {}
+        for record in self.phases:
+            total = totals.setdefault(record["phase"], {"calls": 0, "wall_time": 0, "cpu_time": 0})
+            total["calls"] += 1
+            total["wall_time"] += record["wall_time"]
+            total["cpu_time"] += record["cpu_time"]
+        return totals
+
+    def constraint_families(self):
+        families = {}
+        for record in self.phases:
+            for family, generated in record.get("constraints", {}).items():
+                families.setdefault(family, {"generated": 0, "discarded": 0})["generated"] += generated
+        for family, discarded in self.discarded_constraints.items():
+            families.setdefault(family, {"generated": 0, "discarded": 0})["discarded"] += discarded
+        return families
+
+    def write_trace(self, path, run_info=None):
+        with open(path, "w") as trace_file:
+            json.dump({"run_info": run_info,
+                       "phases": self.phases,
+                       "phase_totals": self.phase_totals(),
+                       "constraint_families": self.constraint_families()},
+                      trace_file, indent=4, default=str)
@@ -0,0 +1,114 @@
+import heapq
+from math import inf
+
+
+class IntervalScheduler:
+    """Weighted interval scheduling on identical machines, solved exactly as a min-cost flow.
+
+    Time points are nodes, chained by edges of capacity equal to the number of machines and no cost; each interval
+    is an edge from its start to its end, of capacity 1 and cost minus its weight. Each unit of flow from the first
+    to the last time point is the timeline of one machine. Intervals touching at an endpoint do not overlap.
+    """
+
+    def __init__(self, machines):
+        self.machines = machines
+
+    # intervals: list of (start, end, weight); returns the machine (1, ..., machines) of each interval, 0 if left out
+    def schedule(self, intervals):
+        if not intervals or self.machines == 0:
+            return [0 for _ in intervals]
+
+        points = sorted({start for (start, _, _) in intervals} | {end for (_, end, _) in intervals})
+        node = {point: n for n, point in enumerate(points)}
+        self.nodes = len(points)
+        # edges as [head, residual capacity, cost, reverse edge index]
+        self.graph = [[] for _ in range(self.nodes)]
+        self.chain_edges = [self.add_edge(n, n + 1, self.machines, 0) for n in range(self.nodes - 1)]
+        self.interval_edges = [self.add_edge(node[start], node[end], 1, -weight) for (start, end, weight) in intervals]
+
+        self.send_flow(0, self.nodes - 1)
+        return self.decompose_flow(intervals)
+
+    def add_edge(self, tail, head, capacity, cost):
+        self.graph[tail].append([head, capacity, cost, len(self.graph[head])])
+        self.graph[head].append([tail, 0, -cost, len(self.graph[tail]) - 1])
+        return (tail, len(self.graph[tail]) - 1)
+
+    # all the edges go forward in time: shortest distances in node order, negative costs included
+    def initial_potentials(self):
+        distance = [inf] * self.nodes
+        distance[0] = 0
+        for tail in range(self.nodes):
+            for (head, capacity, cost, _) in self.graph[tail]:
+                if capacity > 0 and distance[tail] + cost < distance[head]:
+                    distance[head] = distance[tail] + cost
+        return distance
+
+    # successive shortest paths, with Dijkstra on the reduced costs
+    def send_flow(self, source, sink):
+        potential = self.initial_potentials()
+        remaining = self.machines
+        while remaining > 0:
+            distance = [inf] * self.nodes
+            previous = [None] * self.nodes
+            distance[source] = 0
+            queue = [(0, source)]
+            while queue:
+                d, tail = heapq.heappop(queue)
+                if d > distance[tail]:
+                    continue
+                for e, (head, capacity, cost, _) in enumerate(self.graph[tail]):
+                    if capacity <= 0:
+                        continue
+                    # reduced costs are non-negative, up to rounding
+                    reduced = max(cost + potential[tail] - potential[head], 0)
+                    if d + reduced < distance[head]:
+                        distance[head] = d + reduced
+                        previous[head] = (tail, e)
+                        heapq.heappush(queue, (distance[head], head))
+            if distance[sink] == inf:
+                break
+            for n in range(self.nodes):
+                if distance[n] < inf:
+                    potential[n] += distance[n]
+
+            flow = remaining
+            n = sink
+            while n != source:
+                tail, e = previous[n]
+                flow = min(flow, self.graph[tail][e][1])
+                n = tail
+            n = sink
+            while n != source:
+                tail, e = previous[n]
+                edge = self.graph[tail][e]
+                edge[1] -= flow
+                self.graph[edge[0]][edge[3]][1] += flow
+                n = tail
+            remaining -= flow
+
+    # splits the flow into one path per machine: the intervals on a path go to that machine
+    def decompose_flow(self, intervals):
+        chain_flow = [self.graph[tail][e][1] for (tail, e) in self.chain_edges]
+        chain_flow = [self.machines - residual for residual in chain_flow]
+        # intervals with flow, by start node
+        pending = [[] for _ in range(self.nodes)]
+        for interval, (tail, e) in enumerate(self.interval_edges):
+            if self.graph[tail][e][1] == 0:
+                pending[tail].append(interval)
+
+        assignment = [0 for _ in intervals]
+        for machine in range(1, self.machines + 1):
+            n = 0
+            while n < self.nodes - 1:
+                if pending[n]:
+                    interval = pending[n].pop()
+                    assignment[interval] = machine
+                    tail, e = self.interval_edges[interval]
+                    n = self.graph[tail][e][0]
+                elif chain_flow[n] > 0:
+                    chain_flow[n] -= 1
+                    n += 1
+                else:
+                    break
+        return assignment
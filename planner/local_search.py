@@ -0,0 +1,291 @@
+import math
+import random
+import time
+from bisect import bisect_left, insort
+
+from planner.greedy_planner import Planner as GreedyPlanner
+
+
+class LocalSearchPlanner(GreedyPlanner):
+    """Simulated annealing over the greedy schedule, maximising the total priority of the scheduled patients.
+
+    Moves: insert a waiting patient, remove a scheduled one, swap a scheduled patient with a waiting one, move a
+    patient to another (k, t) slot and reassign an anesthetist. Each room timeline and each anesthetist timeline
+    is kept sorted by start time, so a move only looks at the gaps of the slots it touches: its cost depends on
+    the patients of those room-days, never on the size of the whole schedule. As in the greedy planner, delays
+    are not considered.
+    """
+
+    MOVES = ["insert", "remove", "swap", "move", "reassign_anesthetist"]
+
+    def __init__(self, timeLimit, seed=None, packingStrategy="best fit", anesthetistAssignmentStrategy="WIS", iterations_cap=None):
+        super().__init__(packingStrategy, anesthetistAssignmentStrategy)
+        self.timeLimit = timeLimit
+        self.random = random.Random(seed)
+        self.iterations_cap = iterations_cap
+
+    def solve_model(self, dataDictionary):
+        start_time = time.perf_counter()
+        super().solve_model(dataDictionary)
+        self.initial_objective_value = self.compute_objective_value()
+        self.create_search_state()
+
+        self.iterations = 0
+        self.accepted_moves = {move: 0 for move in LocalSearchPlanner.MOVES}
+        self.best_objective_value = self.objective_value
+        self.best_schedule = self.snapshot()
+        # the temperature starts at the average priority, and is 1% of it when time runs out
+        initial_temperature = sum(p.priority for p in self.patients_by_id.values()) / max(len(self.patients_by_id), 1)
+        while self.iterations_cap is None or self.iterations < self.iterations_cap:
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= self.timeLimit:
+                break
+            self.iterations += 1
+            temperature = initial_temperature * 0.01 ** (elapsed / self.timeLimit)
+            move = self.random.choice(LocalSearchPlanner.MOVES)
+            if getattr(self, move)(temperature):
+                self.accepted_moves[move] += 1
+        self.save_if_best()
+        self.restore(self.best_schedule)
+        self.run_time = time.perf_counter() - start_time
+
+    def extract_run_info(self):
+        return {"objective_function_value": self.compute_objective_value(),
+                "initial_objective_value": self.initial_objective_value,
+                "iterations": self.iterations,
+                "accepted_moves": self.accepted_moves,
+                "run_time": self.run_time}
+
+    def create_search_state(self):
+        K = self.dataDictionary[None]["K"][None]
+        T = self.dataDictionary[None]["T"][None]
+        A = self.dataDictionary[None]["A"][None]
+        # patients removed from the greedy schedule (e.g. for lack of an anesthetist) are back on the waiting list
+        scheduled = {p.id: (p, (k, t)) for k in range(1, K + 1) for t in range(1, T + 1) for p in self.solution[(k, t)]}
+        self.patients_by_id = {p.id: scheduled[p.id][0] if p.id in scheduled else p for p in self.patient_table.patients()}
+
+        # room and anesthetist timelines: sorted (start, id) and (start, end, id) entries
+        self.rooms = {(k, t): [] for k in range(1, K + 1) for t in range(1, T + 1)}
+        self.anesthetists = {(a, t): [] for a in range(1, A + 1) for t in range(1, T + 1)}
+        self.anesthetist_time = {(a, t): 0 for a in range(1, A + 1) for t in range(1, T + 1)}
+        self.slot = {}
+        self.slots_by_specialty = {}
+        for t in range(1, T + 1):
+            for k in range(1, K + 1):
+                self.slots_by_specialty.setdefault(self.roomSpecialtyMapping[k], []).append((k, t))
+
+        self.scheduled = RandomSet()
+        self.waiting = RandomSet()
+        self.objective_value = 0
+        for id, p in self.patients_by_id.items():
+            if id in scheduled:
+                self.place(p, scheduled[id][1], p.order, p.anesthetist)
+            else:
+                self.waiting.add(id)
+
+    def place(self, patient, slot, start, anesthetist):
+        (k, t) = slot
+        patient.order = start
+        patient.anesthetist = anesthetist
+        insort(self.rooms[slot], (start, patient.id))
+        if anesthetist:
+            insort(self.anesthetists[(anesthetist, t)], (start, start + patient.operatingTime, patient.id))
+            self.anesthetist_time[(anesthetist, t)] += patient.operatingTime
+        self.slot[patient.id] = slot
+        self.waiting.discard(patient.id)
+        self.scheduled.add(patient.id)
+        self.objective_value += patient.priority
+
+    def unplace(self, patient):
+        slot = self.slot.pop(patient.id)
+        (k, t) = slot
+        timeline = self.rooms[slot]
+        timeline.pop(bisect_left(timeline, (patient.order, patient.id)))
+        if patient.anesthetist:
+            anesthetist_timeline = self.anesthetists[(patient.anesthetist, t)]
+            anesthetist_timeline.pop(bisect_left(anesthetist_timeline, (patient.order, patient.order + patient.operatingTime, patient.id)))
+            self.anesthetist_time[(patient.anesthetist, t)] -= patient.operatingTime
+        self.scheduled.discard(patient.id)
+        self.waiting.add(patient.id)
+        self.objective_value -= patient.priority
+        previous = (slot, patient.order, patient.anesthetist)
+        patient.anesthetist = 0
+        return previous
+
+    # free intervals of the room where the patient keeps the precedence order: (gap start, gap end)
+    def room_gaps(self, patient, slot):
+        gaps = []
+        previous_end = 0
+        previous_precedence = -math.inf
+        for (start, id) in self.rooms[slot]:
+            other = self.patients_by_id[id]
+            if previous_precedence <= patient.precedence <= other.precedence:
+                gaps.append((previous_end, start))
+            previous_end = start + other.operatingTime
+            previous_precedence = other.precedence
+        if previous_precedence <= patient.precedence:
+            gaps.append((previous_end, self.dataDictionary[None]["s"][slot]))
+        return gaps
+
+    # earliest start within [gap_start, gap_end] at which the anesthetist is free for the whole operation
+    def anesthetist_start(self, anesthetist, t, duration, gap_start, gap_end):
+        if self.anesthetist_time[(anesthetist, t)] + duration > self.dataDictionary[None]["An"][(anesthetist, t)]:
+            return None
+        start = gap_start
+        for (busy_start, busy_end, _) in self.anesthetists[(anesthetist, t)]:
+            if busy_end <= start:
+                continue
+            if start + duration <= busy_start:
+                break
+            start = busy_end
+        if start + duration <= gap_end:
+            return start
+        return None
+
+    # earliest feasible (start, anesthetist) for the patient in the slot, or None
+    def find_position(self, patient, slot, anesthetists=None):
+        (k, t) = slot
+        if anesthetists is None:
+            anesthetists = range(1, self.dataDictionary[None]["A"][None] + 1)
+        for (gap_start, gap_end) in self.room_gaps(patient, slot):
+            if gap_end - gap_start < patient.operatingTime:
+                continue
+            if patient.anesthesia == 0:
+                return gap_start, 0
+            for a in anesthetists:
+                start = self.anesthetist_start(a, t, patient.operatingTime, gap_start, gap_end)
+                if start is not None:
+                    return start, a
+        return None
+
+    def try_insert(self, patient, slot):
+        position = self.find_position(patient, slot)
+        if position is None:
+            return False
+        self.place(patient, slot, *position)
+        return True
+
+    def random_slot(self, patient):
+        slots = self.slots_by_specialty.get(patient.specialty)
+        if not slots:
+            return None
+        return self.random.choice(slots)
+
+    def accept(self, delta, temperature):
+        if delta >= 0:
+            return True
+        if self.random.random() < math.exp(delta / temperature):
+            # only worsening moves can leave the best schedule: it is saved before, instead of after each improvement
+            self.save_if_best()
+            return True
+        return False
+
+    def save_if_best(self):
+        if self.objective_value > self.best_objective_value:
+            self.best_objective_value = self.objective_value
+            self.best_schedule = self.snapshot()
+
+    def insert(self, temperature):
+        if not self.waiting:
+            return False
+        patient = self.patients_by_id[self.waiting.choice(self.random)]
+        slot = self.random_slot(patient)
+        return slot is not None and self.try_insert(patient, slot)
+
+    def remove(self, temperature):
+        if not self.scheduled:
+            return False
+        patient = self.patients_by_id[self.scheduled.choice(self.random)]
+        if not self.accept(-patient.priority, temperature):
+            return False
+        self.unplace(patient)
+        return True
+
+    # a scheduled patient leaves room for a waiting one of the same specialty
+    def swap(self, temperature):
+        if not self.scheduled or not self.waiting:
+            return False
+        leaving = self.patients_by_id[self.scheduled.choice(self.random)]
+        entering = self.patients_by_id[self.waiting.choice(self.random)]
+        if entering.specialty != leaving.specialty or not self.accept(entering.priority - leaving.priority, temperature):
+            return False
+        previous = self.unplace(leaving)
+        if self.try_insert(entering, previous[0]):
+            return True
+        self.place(leaving, *previous)
+        return False
+
+    # to another (k, t) slot: frees space where the patient was, at no cost
+    def move(self, temperature):
+        if not self.scheduled:
+            return False
+        patient = self.patients_by_id[self.scheduled.choice(self.random)]
+        slot = self.random_slot(patient)
+        if slot == self.slot[patient.id]:
+            return False
+        previous = self.unplace(patient)
+        if self.try_insert(patient, slot):
+            return True
+        self.place(patient, *previous)
+        return False
+
+    def reassign_anesthetist(self, temperature):
+        if not self.scheduled:
+            return False
+        patient = self.patients_by_id[self.scheduled.choice(self.random)]
+        if patient.anesthesia == 0:
+            return False
+        others = [a for a in range(1, self.dataDictionary[None]["A"][None] + 1) if a != patient.anesthetist]
+        if not others:
+            return False
+        slot = self.slot[patient.id]
+        previous = self.unplace(patient)
+        position = self.find_position(patient, slot, [self.random.choice(others)])
+        if position is None:
+            self.place(patient, *previous)
+            return False
+        self.place(patient, slot, *position)
+        return True
+
+    def snapshot(self):
+        return {id: (slot, self.patients_by_id[id].order, self.patients_by_id[id].anesthetist) for id, slot in self.slot.items()}
+
+    # rebuilds the solution dictionary from a snapshot
+    def restore(self, schedule):
+        self.solution = {slot: [] for slot in self.rooms}
+        for id, (slot, start, anesthetist) in schedule.items():
+            patient = self.patients_by_id[id]
+            patient.order = start
+            patient.anesthetist = anesthetist
+            self.solution[slot].append(patient)
+        for slot in self.solution:
+            self.solution[slot].sort(key=lambda p: p.order)
+        self.patients = [self.patients_by_id[id] for id in self.patients_by_id if id not in schedule]
+
+
+class RandomSet:
+    """Set with O(1) insertion, removal and uniform random choice."""
+
+    def __init__(self):
+        self.items = []
+        self.positions = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+
+    def choice(self, generator):
+        return generator.choice(self.items)
@@ -1,4 +1,11 @@
+import numpy as np
+
+
 class Patient:
+
+    # no per-instance __dict__: waiting lists hold many of these
+    __slots__ = ('id', 'priority', 'room', 'specialty', 'day', 'operatingTime', 'arrival_delay', 'covid', 'precedence', 'delayWeight', 'anesthesia', 'anesthetist', 'order', 'delay')
+
     def __init__(self, id, priority, room, specialty, day, operatingTime, arrival_delay, covid, precedence, delayWeight, anesthesia, anesthetist, order, delay):
         self.id = id
         self.priority = priority
@@ -21,4 +28,63 @@ class Patient:
     def none_to_empty(self, s):
         if(s is None):
             return ""
-        return str(s)
\ No newline at end of file
+        return str(s)
+
+
+class PatientTable:
+    """Waiting list as a NumPy structured array, one row per patient: Patient records are made only for the rows which are needed."""
+
+    DTYPE = np.dtype([('id', np.int64),
+                      ('priority', np.float64),
+                      ('specialty', np.int64),
+                      ('operatingTime', np.int64),
+                      ('covid', np.int64),
+                      ('precedence', np.int64),
+                      ('anesthesia', np.int64)])
+
+    # table field -> data dictionary entry
+    DATA_ENTRIES = {'priority': 'r',
+                    'specialty': 'specialty',
+                    'operatingTime': 'p',
+                    'covid': 'c',
+                    'precedence': 'precedence',
+                    'anesthesia': 'a'}
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @staticmethod
+    def from_data_dictionary(data):
+        data = data[None]
+        I = data['I'][None]
+        rows = np.zeros(I, dtype=PatientTable.DTYPE)
+        rows['id'] = np.arange(1, I + 1)
+        for field, entry in PatientTable.DATA_ENTRIES.items():
+            rows[field] = np.fromiter((data[entry][i] for i in range(1, I + 1)), dtype=PatientTable.DTYPE[field], count=I)
+        return PatientTable(rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    # rows by non-increasing priority / operating time (ties keep the id order)
+    def ratio_order(self):
+        return np.argsort(-self.rows['priority'] / self.rows['operatingTime'], kind='stable')
+
+    # Patient records of the given rows (all of them by default), not yet planned
+    def patients(self, rows=None):
+        selected = self.rows if rows is None else self.rows[rows]
+        return [Patient(id=id,
+                        priority=priority,
+                        room=0,
+                        specialty=specialty,
+                        day=0,
+                        operatingTime=operatingTime,
+                        arrival_delay=0,
+                        covid=covid,
+                        precedence=precedence,
+                        delayWeight=None,
+                        anesthesia=anesthesia,
+                        anesthetist=0,
+                        order=0,
+                        delay=False)
+                for (id, priority, specialty, operatingTime, covid, precedence, anesthesia) in selected.tolist()]
@@ -0,0 +1,55 @@
+import math
+
+from planner.instance_io import SCALARS, PATIENT_VECTORS, TABLES
+
+
+class PatientDelta:
+    """Changes to the waiting list since the previous plan.
+
+    added: parameters of the new patients, one dictionary each with the entries of PATIENT_VECTORS and 'd' ({q: delay});
+    removed: indices of the patients who left the waiting list;
+    durations: new operating times, by patient index.
+    Indices are those of the previous data dictionary.
+    """
+
+    def __init__(self, added=None, removed=None, durations=None):
+        self.added = added or []
+        self.removed = set(removed or [])
+        self.durations = durations or {}
+
+    # whether the room-day where the patient was scheduled has to be planned again
+    def is_changed(self, i):
+        return i in self.removed or i in self.durations
+
+    # returns the new data dictionary, and the new index of each kept patient: kept patients come first, in their
+    # previous order, then the added ones
+    def apply(self, data):
+        data = data[None]
+        kept = [i for i in range(1, data['I'][None] + 1) if i not in self.removed]
+        new_index = {i: n for n, i in enumerate(kept, start=1)}
+        I = len(kept) + len(self.added)
+        Q = data['Q'][None]
+
+        new_data = {name: {None: data[name][None]} for name in SCALARS}
+        new_data['I'] = {None: I}
+        for name in TABLES:
+            if name != 'd':
+                new_data[name] = dict(data[name])
+        for name in PATIENT_VECTORS:
+            new_data[name] = {new_index[i]: data[name][i] for i in kept}
+        new_data['d'] = {(q, new_index[i]): data['d'][(q, i)] for q in range(1, Q + 1) for i in kept}
+        for n, patient in enumerate(self.added, start=len(kept) + 1):
+            for name in PATIENT_VECTORS:
+                new_data[name][n] = patient[name]
+            for q in range(1, Q + 1):
+                new_data['d'][(q, n)] = patient['d'][q]
+        for i, duration in self.durations.items():
+            if i in new_index:
+                new_data['p'][new_index[i]] = duration
+
+        new_data['patientId'] = {n: n for n in range(1, I + 1)}
+        # as in DataMaker: the longest operating day, and the most operations fitting in it
+        maxOperatingRoomTime = max(new_data['s'].values())
+        new_data['bigM'] = {1: math.floor(maxOperatingRoomTime / min(new_data['p'].values())),
+                            2: maxOperatingRoomTime}
+        return {None: new_data}, new_index
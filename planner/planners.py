@@ -1,13 +1,19 @@
 from __future__ import division
+import random
 import re
 import time
+from concurrent.futures import ProcessPoolExecutor
 import pyomo.environ as pyo
 from pyomo.opt import SolverStatus, TerminationCondition
-from math import isclose, inf
+from math import isclose, inf, prod
+import numpy as np
 
 from abc import ABC, abstractmethod
 
 from planner.model import Patient
+from planner.instrumentation import Instrumentation
+from planner.sequencing import DaySequencer, FEASIBLE, INFEASIBLE, BUDGET_EXHAUSTED
+from planner.greedy_planner import Planner as GreedyPlanner
 
 
 class Planner(ABC):
@@ -15,6 +21,11 @@ class Planner(ABC):
     DISCARDED = 0
     FREE = 1
 
+    # parameters which can change between solves without changing the structure of the model
+    MUTABLE_PARAMETERS = ['r', 'An', 'Gamma']
+    # entries added to the data by the planners themselves
+    PLANNER_PARAMETERS = ['status', 'x_param']
+
     def __init__(self, timeLimit, gap, solver):
         self.solver = pyo.SolverFactory(solver)
         if(solver == "cplex"):
@@ -39,9 +50,23 @@ class Planner(ABC):
 
         self.solver.options[self.timeLimit] = timeLimit
         self.solver.options[self.gap] = gap
+        # the time limit option is consumed during a run: each run starts again from the configured one
+        self.configured_time_limit = timeLimit
 
+        self.instrumentation = Instrumentation()
         self.reset_run_info()
 
+        # when reusing the model, the instance built for a given structure is kept and only its mutable parameters are updated
+        self.reuse_model = False
+        self.model_defined = False
+        self.instance_structure = None
+        self.instance_constraint_counts = None
+
+        self.progress_callback = None
+
+    def reset_time_limit(self):
+        self.solver.options[self.timeLimit] = self.configured_time_limit
+
     def reset_run_info(self):
         self.solver_time = 0
         self.cumulated_building_time = 0
@@ -55,27 +80,45 @@ class Planner(ABC):
         self.upper_bound = 0
         self.generated_constraints = 0
         self.discarded_constraints = 0
+        self.instrumentation.reset()
+        self.run_start = time.perf_counter()
+        self.stop_requested = False
 
 
     @abstractmethod
     def extract_run_info(self):
         pass
 
+    # the callback receives a dictionary for each new incumbent ("incumbent" event, with its Solution) and each
+    # improved bound ("bound" event); returning False stops the run after the current iteration
+    def set_progress_callback(self, callback):
+        self.progress_callback = callback
+
+    def report_progress(self, event, **info):
+        if self.progress_callback is None:
+            return
+        progress = {"event": event,
+                    "iteration": self.instrumentation.iteration,
+                    "elapsed": time.perf_counter() - self.run_start}
+        progress.update(info)
+        if self.progress_callback(progress) is False:
+            self.stop_requested = True
+
     @abstractmethod
     def define_model(self):
         pass
 
     def single_surgery_rule(self, model, i):
         self.generated_constraints += 1
-        return sum(model.x[i, k, t] for k in model.k for t in model.t) <= 1
+        return sum(model.x[i, k, t] for k in model.k for t in model.t if (i, k, t) in model.eligible_ikt) <= 1
 
     def single_delay_rule(self, model, i):
         self.generated_constraints += 1
-        return sum(model.delta[q, i, k, t] for k in model.k for t in model.t for q in model.q) <= 1
+        return sum(model.delta[q, i, k, t] for k in model.k for t in model.t for q in model.q if (i, k, t) in model.eligible_ikt) <= 1
 
     def robustness_constraints_rule(self, model, q, k, t):
         self.generated_constraints += 1
-        return sum(model.delta[q, i, k, t] for i in model.i) <= model.Gamma[q, k, t]
+        return sum(model.delta[q, i, k, t] for i in model.i if (i, k, t) in model.eligible_ikt) <= model.Gamma[q, k, t]
 
     def delay_implication_constraint_rule(self, model, i, k, t):
         self.generated_constraints += 1
@@ -83,21 +126,21 @@ class Planner(ABC):
 
     def surgery_time_rule(self, model, k, t):
         self.generated_constraints += 1
-        return sum(model.p[i] * model.x[i, k, t] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) for i in model.i) <= model.s[k, t]
+        return sum(model.p[i] * model.x[i, k, t] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) for i in model.i if (i, k, t) in model.eligible_ikt) <= model.s[k, t]
 
     def specialty_assignment_rule(self, model, j, k, t):
         self.generated_constraints += 1
-        return sum(model.x[i, k, t] for i in model.i if model.specialty[i] == j) <= model.bigM[1] * model.tau[j, k, t]
+        return sum(model.x[i, k, t] for i in model.i if model.specialty[i] == j and (i, k, t) in model.eligible_ikt) <= model.bigM[1] * model.tau[j, k, t]
 
     def anesthetist_assignment_rule(self, model, i, t):
         self.generated_constraints += 1
-        return sum(model.beta[alpha, i, t] for alpha in model.alpha) == model.a[i] * sum(model.x[i, k, t] for k in model.k)
+        return sum(model.beta[alpha, i, t] for alpha in model.alpha) == sum(model.x[i, k, t] for k in model.k if (i, k, t) in model.eligible_ikt)
 
     def anesthetist_time_rule(self, model, alpha, t):
         if sum(model.a[i] for i in model.i) == 0:
             return pyo.Constraint.Skip
         self.generated_constraints += 1
-        return sum(model.beta[alpha, i, t] * model.p[i] for i in model.i if model.a[i] == 1) + sum(model.z[q, alpha, i, k, t] * model. d[q, i] for i in model.i for k in model.k for q in model.q if model.a[i] == 1) <= model.An[alpha, t]
+        return sum(model.beta[alpha, i, t] * model.p[i] for i in model.i if model.a[i] == 1) + sum(model.z[q, alpha, i, k, t] * model. d[q, i] for i in model.i for k in model.k for q in model.q if model.a[i] == 1 and (i, k, t) in model.eligible_ikt) <= model.An[alpha, t]
 
     # needed for linearizing product of binary variables
     def z_rule_1(self, model, q, alpha, i, k, t):
@@ -115,43 +158,128 @@ class Planner(ABC):
     def symmetry_rule(self, model, t1, t2):
         if t1 >= t2:
             return pyo.Constraint.Skip
-        return sum(model.x[i, k, t1] for i in model.i for k in model.k) >= sum(model.x[i, k, t2] for i in model.i for k in model.k)
+        return sum(model.x[i, k, t1] for i in model.i for k in model.k if (i, k, t1) in model.eligible_ikt) >= sum(model.x[i, k, t2] for i in model.i for k in model.k if (i, k, t2) in model.eligible_ikt)
 
     # patients with same anesthetist on same day but different room cannot overlap
-    @abstractmethod
     def anesthetist_no_overlap_rule(self, model, i1, i2, k1, k2, t, alpha):
-        pass
+        self.generated_constraints += 1
+        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k1, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (5 - model.beta[alpha, i1, t] - model.beta[alpha, i2, t] - model.x[i1, k1, t] - model.x[i2, k2, t] - model.Lambda[i1, i2, t])
 
     # precedence across rooms
-    @abstractmethod
     def lambda_rule(self, model, i1, i2, t):
-        pass
+        self.generated_constraints += 1
+        return model.Lambda[i1, i2, t] + model.Lambda[i2, i1, t] == 1
 
     # ensure gamma plus operation time does not exceed end of day
-    @abstractmethod
     def end_of_day_rule(self, model, i, k, t):
-        pass
+        self.generated_constraints += 1
+        return model.gamma[i] + model.p[i] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) <= model.s[k, t]
 
     # ensure that patient i1 terminates operation before i2, if y_12kt = 1
-    @abstractmethod
     def time_ordering_precedence_rule(self, model, i1, i2, k, t):
-        pass
+        self.generated_constraints += 1
+        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (3 - model.x[i1, k, t] - model.x[i2, k, t] - model.y[i1, i2, k, t])
 
-    @abstractmethod
+    # generated only for i1 preceding i2 (see priority_indices)
     def start_time_ordering_priority_rule(self, model, i1, i2, k, t):
-        pass
+        self.generated_constraints += 1
+        return model.gamma[i1] <= model.gamma[i2] + model.bigM[2] * (2 - model.x[i1, k, t] - model.x[i2, k, t])
 
     # either i1 comes before i2 in (k, t) or i2 comes before i1 in (k, t)
-    @abstractmethod
     def exclusive_precedence_rule(self, model, i1, i2, k, t):
-        pass
+        self.generated_constraints += 1
+        return model.y[i1, i2, k, t] + model.y[i2, i1, k, t] == 1
 
     def objective_function(self, model):
         N = (sum(model.r[i] for i in model.i))
-        R = sum(model.x[i, k, t] * model.r[i] for i in model.i for k in model.k for t in model.t)
-        D = sum(model.d[q, i] * model.delta[q, i, k, t] for i in model.i for k in model.k for t in model.t for q in model.q)
+        R = sum(model.x[i, k, t] * model.r[i] for (i, k, t) in model.eligible_ikt)
+        D = sum(model.d[q, i] * model.delta[q, i, k, t] for (q, i, k, t) in model.eligible_qikt)
         return  D + R / N
 
+    # sparse index sets: variables and constraints are declared only over indices which can be non-zero,
+    # instead of building the full Cartesian product and skipping most of it
+    def eligible_indices(self, model):
+        return [(i, k, t) for i in model.i for k in model.k for t in model.t if model.tau[model.specialty[i], k, t] == 1]
+
+    def eligible_delay_indices(self, model):
+        return [(q, i, k, t) for q in model.q for (i, k, t) in model.eligible_ikt]
+
+    def eligible_slot_indices(self, model):
+        slots = {(k, t) for (_, k, t) in model.eligible_ikt}
+        return [(k, t) for k in model.k for t in model.t if (k, t) in slots]
+
+    def specialty_assignment_indices(self, model):
+        slots = {(model.specialty[i], k, t) for (i, k, t) in model.eligible_ikt}
+        return [(j, k, t) for j in model.j for k in model.k for t in model.t if (j, k, t) in slots]
+
+    def anesthetist_assignment_indices(self, model):
+        return [(i, t) for i in model.i for t in model.t if model.a[i] == 1]
+
+    def beta_indices(self, model):
+        return [(alpha, i, t) for alpha in model.alpha for i in model.i for t in model.t if model.a[i] == 1]
+
+    def z_indices(self, model):
+        return [(q, alpha, i, k, t) for q in model.q for alpha in model.alpha for (i, k, t) in model.eligible_ikt if model.a[i] == 1]
+
+    # (i, k, t) triples for which sequencing components are needed; planners may further restrict them
+    def is_active(self, model, i, k, t):
+        return True
+
+    def active_indices(self, model):
+        return [(i, k, t) for (i, k, t) in model.eligible_ikt if self.is_active(model, i, k, t)]
+
+    # ordered pairs of anesthesia patients which may be operated on the same day
+    def lambda_indices(self, model):
+        day_patients = {}
+        for (i, k, t) in model.active_ikt:
+            if model.a[i] == 1:
+                day_patients.setdefault(t, {})[i] = None
+        return [(i1, i2, t) for t, patients in day_patients.items() for i1 in patients for i2 in patients if i1 != i2]
+
+    # ordered pairs of patients of the same specialty which may share the same (k, t) slot
+    def y_indices(self, model):
+        slot_patients = {}
+        for (i, k, t) in model.active_ikt:
+            slot_patients.setdefault((k, t), []).append(i)
+        return [(i1, i2, k, t) for (k, t), patients in slot_patients.items() for i1 in patients for i2 in patients if i1 != i2 and model.specialty[i1] == model.specialty[i2]]
+
+    def anesthetist_no_overlap_indices(self, model):
+        day_assignments = {}
+        for (i, k, t) in model.active_ikt:
+            if model.a[i] == 1:
+                day_assignments.setdefault(t, []).append((i, k))
+        indices = [(i1, i2, k1, k2, t, alpha) for t, assignments in day_assignments.items() for (i1, k1) in assignments for (i2, k2) in assignments if i1 != i2 and k1 != k2 for alpha in model.alpha]
+        return self.count_discarded_indices("anesthetist_no_overlap_constraint", indices, model.i, model.i, model.k, model.k, model.t, model.alpha)
+
+    def lambda_constraint_indices(self, model):
+        indices = [(i1, i2, t) for (i1, i2, t) in model.Lambda_indices if i1 < i2]
+        return self.count_discarded_indices("lambda_constraint", indices, model.i, model.i, model.t)
+
+    def end_of_day_indices(self, model):
+        return self.count_discarded_indices("end_of_day_constraint", list(model.active_ikt), model.i, model.k, model.t)
+
+    def priority_indices(self, model):
+        indices = [(i1, i2, k, t) for (i1, i2, k, t) in model.y_indices if self.precedes(model, i1, i2)]
+        return self.count_discarded_indices("priority_constraint", indices, model.i, model.i, model.k, model.t)
+
+    def precedence_indices(self, model):
+        return self.count_discarded_indices("precedence_constraint", list(model.y_indices), model.i, model.i, model.k, model.t)
+
+    def exclusive_precedence_indices(self, model):
+        indices = [(i1, i2, k, t) for (i1, i2, k, t) in model.y_indices if i1 < i2]
+        return self.count_discarded_indices("exclusive_precedence_constraint", indices, model.i, model.i, model.k, model.t)
+
+    # i1 has to start before i2 if both are in the same room: derived from the precedence classes, instead of an I x I parameter
+    def precedes(self, model, i1, i2):
+        return model.precedence[i1] < model.precedence[i2]
+
+    # constraints not generated with respect to the full Cartesian product of their index sets
+    def count_discarded_indices(self, family, indices, *dense_sets):
+        discarded = prod(len(s) for s in dense_sets) - len(indices)
+        self.discarded_constraints += discarded
+        self.instrumentation.count_discarded(family, discarded)
+        return indices
+
     # constraints
     def define_single_surgery_constraints(self, model):
         model.single_surgery_constraint = pyo.Constraint(
@@ -166,34 +294,33 @@ class Planner(ABC):
     def define_robustness_constraints(self, model):
         model.robustness_constraint = pyo.Constraint(
             model.q,
-            model.k,
-            model.t,
+            model.eligible_kt,
             rule=lambda model, q, k, t: self.robustness_constraints_rule(model, q, k, t))
 
     def define_delay_implication_constraint(self, model):
         model.delay_implication_constraint = pyo.Constraint(
-            model.i,
-            model.k,
-            model.t,
+            model.eligible_ikt,
             rule=lambda model, i, k, t: self.delay_implication_constraint_rule(model, i, k, t))
 
     def define_surgery_time_constraints(self, model):
         model.surgery_time_constraint = pyo.Constraint(
-            model.k,
-            model.t,
+            model.eligible_kt,
             rule=lambda model, k, t: self.surgery_time_rule(model, k, t))
 
     def define_specialty_assignment_constraints(self, model):
+        model.specialty_assignment_indices = pyo.Set(
+            dimen=3,
+            initialize=lambda model: self.specialty_assignment_indices(model))
         model.specialty_assignment_constraint = pyo.Constraint(
-            model.j,
-            model.k,
-            model.t,
+            model.specialty_assignment_indices,
             rule=lambda model, j, k, t: self.specialty_assignment_rule(model, j, k, t))
 
     def define_anesthetist_assignment_constraint(self, model):
+        model.anesthetist_assignment_indices = pyo.Set(
+            dimen=2,
+            initialize=lambda model: self.anesthetist_assignment_indices(model))
         model.anesthetist_assignment_constraint = pyo.Constraint(
-            model.i,
-            model.t,
+            model.anesthetist_assignment_indices,
             rule=lambda model, i, t: self.anesthetist_assignment_rule(model, i, t))
 
     def define_anesthetist_time_constraint(self, model):
@@ -203,76 +330,64 @@ class Planner(ABC):
             rule=lambda model, alpha, t: self.anesthetist_time_rule(model, alpha, t))
 
     def define_anesthetist_no_overlap_constraint(self, model):
+        model.anesthetist_no_overlap_indices = pyo.Set(
+            dimen=6,
+            initialize=lambda model: self.anesthetist_no_overlap_indices(model))
         model.anesthetist_no_overlap_constraint = pyo.Constraint(
-            model.i,
-            model.i,
-            model.k,
-            model.k,
-            model.t,
-            model.alpha,
+            model.anesthetist_no_overlap_indices,
             rule=lambda model, i1, i2, k1, k2, t, alpha: self.anesthetist_no_overlap_rule(model, i1, i2, k1, k2, t, alpha))
 
     def define_lambda_constraint(self, model):
+        model.lambda_constraint_indices = pyo.Set(
+            dimen=3,
+            initialize=lambda model: self.lambda_constraint_indices(model))
         model.lambda_constraint = pyo.Constraint(
-            model.i,
-            model.i,
-            model.t,
+            model.lambda_constraint_indices,
             rule=lambda model, i1, i2, t: self.lambda_rule(model, i1, i2, t))
 
     def define_end_of_day_constraint(self, model):
+        model.end_of_day_indices = pyo.Set(
+            dimen=3,
+            initialize=lambda model: self.end_of_day_indices(model))
         model.end_of_day_constraint = pyo.Constraint(
-            model.i,
-            model.k,
-            model.t,
+            model.end_of_day_indices,
             rule=lambda model, i, k, t: self.end_of_day_rule(model, i, k, t))
 
     def define_priority_constraint(self, model):
+        model.priority_indices = pyo.Set(
+            dimen=4,
+            initialize=lambda model: self.priority_indices(model))
         model.priority_constraint = pyo.Constraint(
-            model.i,
-            model.i,
-            model.k,
-            model.t,
+            model.priority_indices,
             rule=lambda model, i1, i2, k, t: self.start_time_ordering_priority_rule(model, i1, i2, k, t))
 
     def define_precedence_constraint(self, model):
+        model.precedence_indices = pyo.Set(
+            dimen=4,
+            initialize=lambda model: self.precedence_indices(model))
         model.precedence_constraint = pyo.Constraint(
-            model.i,
-            model.i,
-            model.k,
-            model.t,
+            model.precedence_indices,
             rule=lambda model, i1, i2, k, t: self.time_ordering_precedence_rule(model, i1, i2, k, t))
 
     def define_exclusive_precedence_constraint(self, model):
+        model.exclusive_precedence_indices = pyo.Set(
+            dimen=4,
+            initialize=lambda model: self.exclusive_precedence_indices(model))
         model.exclusive_precedence_constraint = pyo.Constraint(
-            model.i,
-            model.i,
-            model.k,
-            model.t,
+            model.exclusive_precedence_indices,
             rule=lambda model, i1, i2, k, t: self.exclusive_precedence_rule(model, i1, i2, k, t))
 
     def define_z_constraints(self, model):
         model.z_constraints_1 = pyo.Constraint(
-            model.q,
-            model.alpha,
-            model.i,
-            model.k,
-            model.t,
+            model.z_indices,
             rule=lambda model, q, alpha, i, k, t: self.z_rule_1(model, q, alpha, i, k, t))
 
         model.z_constraints_2 = pyo.Constraint(
-            model.q,
-            model.alpha,
-            model.i,
-            model.k,
-            model.t,
+            model.z_indices,
             rule=lambda model, q, alpha, i, k, t: self.z_rule_2(model, q, alpha, i, k, t))
 
         model.z_constraints_3 = pyo.Constraint(
-            model.q,
-            model.alpha,
-            model.i,
-            model.k,
-            model.t,
+            model.z_indices,
             rule=lambda model, q, alpha, i, k, t: self.z_rule_3(model, q, alpha, i, k, t))
         
     def define_symmetry_constraints(self, model):
@@ -287,16 +402,13 @@ class Planner(ABC):
             sense=pyo.maximize)
 
     def define_lambda_variables(self, model):
-        model.Lambda = pyo.Var(model.i,
-                               model.i,
-                               model.t,
+        model.Lambda_indices = pyo.Set(dimen=3, initialize=lambda model: self.lambda_indices(model))
+        model.Lambda = pyo.Var(model.Lambda_indices,
                                domain=pyo.Binary)
 
     def define_y_variables(self, model):
-        model.y = pyo.Var(model.i,
-                          model.i,
-                          model.k,
-                          model.t,
+        model.y_indices = pyo.Set(dimen=4, initialize=lambda model: self.y_indices(model))
+        model.y = pyo.Var(model.y_indices,
                           domain=pyo.Binary)
 
     def define_gamma_variables(self, model):
@@ -309,13 +421,12 @@ class Planner(ABC):
         model.alpha = pyo.RangeSet(1, model.A)
 
     def define_beta_variables(self, model):
-        model.beta = pyo.Var(model.alpha,
-                             model.i,
-                             model.t,
+        model.beta_indices = pyo.Set(dimen=3, initialize=lambda model: self.beta_indices(model))
+        model.beta = pyo.Var(model.beta_indices,
                              domain=pyo.Binary)
 
     def define_anesthetists_availability(self, model):
-        model.An = pyo.Param(model.alpha, model.t)
+        model.An = pyo.Param(model.alpha, model.t, mutable=True)
 
     def define_sets(self, model):
         model.I = pyo.Param(within=pyo.NonNegativeIntegers)
@@ -332,40 +443,96 @@ class Planner(ABC):
         model.bigMRangeSet = pyo.RangeSet(1, model.M)
         model.q = pyo.RangeSet(1, model.Q)
 
+    # (i, k, t) triples allowed by the specialty assignment tau, and the (k, t) slots they cover
+    def define_eligible_indices(self, model):
+        model.eligible_ikt = pyo.Set(dimen=3, initialize=lambda model: self.eligible_indices(model))
+        model.eligible_qikt = pyo.Set(dimen=4, initialize=lambda model: self.eligible_delay_indices(model))
+        model.eligible_kt = pyo.Set(dimen=2, initialize=lambda model: self.eligible_slot_indices(model))
+
+    def define_active_indices(self, model):
+        model.active_ikt = pyo.Set(dimen=3, initialize=lambda model: self.active_indices(model))
+
     def define_x_variables(self, model):
-        model.x = pyo.Var(model.i,
-                          model.k,
-                          model.t,
+        model.x = pyo.Var(model.eligible_ikt,
                           domain=pyo.Binary)
 
     def define_delta_variables(self, model):
-        model.delta = pyo.Var(model.q,
-                              model.i,
-                              model.k,
-                              model.t,
+        model.delta = pyo.Var(model.eligible_qikt,
                               domain=pyo.Binary)
 
     def define_z_variables(self, model):
-        model.z = pyo.Var(model.q,
-                          model.alpha,
-                          model.i,
-                          model.k,
-                          model.t,
+        model.z_indices = pyo.Set(dimen=5, initialize=lambda model: self.z_indices(model))
+        model.z = pyo.Var(model.z_indices,
                           domain=pyo.Binary)
 
     def define_parameters(self, model):
         model.p = pyo.Param(model.i)
         model.d = pyo.Param(model.q, model.i)
-        model.r = pyo.Param(model.i)
+        model.r = pyo.Param(model.i, mutable=True)
         model.s = pyo.Param(model.k, model.t)
         model.a = pyo.Param(model.i)
         model.c = pyo.Param(model.i)
-        model.u = pyo.Param(model.i, model.i)
         model.tau = pyo.Param(model.j, model.k, model.t)
         model.specialty = pyo.Param(model.i)
         model.bigM = pyo.Param(model.bigMRangeSet)
         model.precedence = pyo.Param(model.i)
-        model.Gamma = pyo.Param(model.q, model.k, model.t)
+        model.Gamma = pyo.Param(model.q, model.k, model.t, mutable=True)
+
+    # starting values for the solver (MIP start), taken from the schedule of the greedy planner
+    def set_warm_start(self, model_instance, data):
+        print("Computing warm start...")
+        greedy_planner = GreedyPlanner(packingStrategy="best fit", anesthetistAssignmentStrategy="WIS")
+        greedy_planner.solve_model(data)
+
+        slot = {}
+        order = {}
+        anesthetist = {}
+        for (k, t), patients in greedy_planner.extract_solution().items():
+            for patient in patients:
+                slot[patient.id] = (k, t)
+                order[patient.id] = patient.order
+                anesthetist[patient.id] = patient.anesthetist
+
+        # the greedy planner does not plan delays, and patients are sequenced by their start time
+        def before(i1, i2):
+            return (order.get(i1, 0), i1) < (order.get(i2, 0), i2)
+
+        start_values = {'x': {(i, k, t): int(slot.get(i) == (k, t)) for (i, k, t) in model_instance.eligible_ikt},
+                        'delta': {index: 0 for index in model_instance.eligible_qikt},
+                        'beta': {(alpha, i, t): int(slot.get(i, (0, 0))[1] == t and anesthetist[i] == alpha) for (alpha, i, t) in model_instance.beta_indices},
+                        'z': {index: 0 for index in model_instance.z_indices}}
+        if model_instance.component('gamma') is not None:
+            start_values['gamma'] = {i: order.get(i, 0) for i in model_instance.i}
+            start_values['y'] = {(i1, i2, k, t): int(before(i1, i2)) for (i1, i2, k, t) in model_instance.y_indices}
+            start_values['Lambda'] = {(i1, i2, t): int(before(i1, i2)) for (i1, i2, t) in model_instance.Lambda_indices}
+
+        for name, values in start_values.items():
+            variables = getattr(model_instance, name)
+            for index, value in values.items():
+                if not variables[index].fixed:
+                    variables[index].set_value(value)
+        print("Warm start set from a greedy schedule with " + str(len(slot)) + " patients.")
+
+    def model_structure(self, data):
+        return {name: dict(values) for name, values in data[None].items() if name not in Planner.MUTABLE_PARAMETERS + Planner.PLANNER_PARAMETERS}
+
+    def can_reuse_instance(self, model_instance, data):
+        return self.reuse_model and model_instance is not None and self.model_structure(data) == self.instance_structure
+
+    def update_mutable_parameters(self, model_instance, data):
+        print("Updating parameters of the existing model instance...")
+        for name in Planner.MUTABLE_PARAMETERS:
+            getattr(model_instance, name).store_values(data[None][name])
+        # the instance still holds the constraints generated when it was built
+        self.generated_constraints, self.discarded_constraints = self.instance_constraint_counts
+
+    def save_instance_structure(self, data):
+        if self.reuse_model:
+            self.instance_structure = self.model_structure(data)
+            self.instance_constraint_counts = (self.generated_constraints, self.discarded_constraints)
+
+    def write_trace(self, path):
+        self.instrumentation.write_trace(path, self.extract_run_info())
 
     def extract_solution(self):
         if self.solution:
@@ -374,111 +541,38 @@ class Planner(ABC):
         return None
 
     def compute_specialty_selection_ratio(self):
-        specialty_selection_ratio = None
         if self.solution:
-            specialty_selection_ratio = {j: 0 for j in range(1, self.solution.J + 1)}
-            for j in range(1, self.solution.J + 1):
-                specialty_j_selected_patients = 0
-                specialty_j_total_patients = 0
-                for (i, _, _) in self.solution.x:
-                    if self.solution.specialty[i] == j:
-                        specialty_j_selected_patients += 1
-                for i in range(1, self.solution.I + 1):
-                    if self.solution.specialty[i] == j:
-                        specialty_j_total_patients += 1
-                specialty_selection_ratio[j] = specialty_j_selected_patients / specialty_j_total_patients
-
-        return specialty_selection_ratio
-    
+            return self.solution.specialty_selection_ratio()
+        return None
+
     def compute_operating_room_utilization_by_specialty(self):
-        operating_room_utilization = self.compute_operating_room_utilization()
-        OR_utilization_by_specialty = None
-        if operating_room_utilization:
-            OR_utilization_by_specialty = {j: 0 for j in range(1, self.solution.J + 1)}
-            for j in range(1, self.solution.J + 1):
-                specialty_j_ORs = 0
-                cumulated_utilization = 0
-                for (k, t) in operating_room_utilization.keys():
-                    if self.solution.tau[(j, k, t)] == 1:
-                        specialty_j_ORs += 1
-                        cumulated_utilization += operating_room_utilization[(k, t)]
-                OR_utilization_by_specialty[j] = cumulated_utilization / specialty_j_ORs
-
-        return OR_utilization_by_specialty
-            
+        if self.solution and self.solution.scheduled.any():
+            return self.solution.operating_room_utilization_by_specialty()
+        return None
+
     def compute_operating_room_utilization(self):
-        room_utilization = None
         if self.solution:
-            room_utilization = {(k, t): 0 for (_, k, t) in self.solution.x}
-            for (i, k, t) in self.solution.x:
-                room_utilization[(k, t)] += self.solution.p[i] + sum(self.solution.d[q, i] for (q, i1, _, _) in self.solution.delta if i == i1)
-            for (k, t) in room_utilization.keys():
-                room_utilization[(k, t)] = room_utilization[(k, t)] / self.solution.s[(k, t)]
-        return room_utilization
+            return self.solution.operating_room_utilization()
+        return None
+
+    def compute_objective_split(self):
+        if self.solution:
+            return self.solution.objective_split()
+        return None
 
 
 class SimplePlanner(Planner):
 
-    def __init__(self, timeLimit, gap, solver):
+    def __init__(self, timeLimit, gap, solver, reuse_model=False):
         super().__init__(timeLimit, gap, solver)
         self.model = pyo.AbstractModel()
         self.model_instance = None
-
-    def anesthetist_no_overlap_rule(self, model, i1, i2, k1, k2, t, alpha):
-        if(i1 == i2 or k1 == k2 or model.a[i1] * model.a[i2] == 0):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k1, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (5 - model.beta[alpha, i1, t] - model.beta[alpha, i2, t] - model.x[i1, k1, t] - model.x[i2, k2, t] - model.Lambda[i1, i2, t])
-
-    def lambda_rule(self, model, i1, i2, t):
-        if(i1 >= i2 or not (model.a[i1] == 1 and model.a[i2] == 1)):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.Lambda[i1, i2, t] + model.Lambda[i2, i1, t] == 1
-
-    def end_of_day_rule(self, model, i, k, t):
-        if((model.specialty[i] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i] + model.p[i] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) <= model.s[k, t]
-
-    def time_ordering_precedence_rule(self, model, i1, i2, k, t):
-        if(i1 == i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (3 - model.x[i1, k, t] - model.x[i2, k, t] - model.y[i1, i2, k, t])
-
-    def start_time_ordering_priority_rule(self, model, i1, i2, k, t):
-        if(i1 == i2 or model.u[i1, i2] == 0
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] * model.u[i1, i2] <= model.gamma[i2] * (1 - model.u[i2, i1]) + model.bigM[2] * (2 - model.x[i1, k, t] - model.x[i2, k, t])
-
-    def exclusive_precedence_rule(self, model, i1, i2, k, t):
-        if(i1 >= i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.y[i1, i2, k, t] + model.y[i2, i1, k, t] == 1
+        self.reuse_model = reuse_model
 
     def define_model(self):
         self.define_sets(self.model)
         self.define_parameters(self.model)
+        self.define_eligible_indices(self.model)
         self.define_x_variables(self.model)
         self.define_delta_variables(self.model)
         self.define_single_delay_constraints(self.model)
@@ -493,6 +587,7 @@ class SimplePlanner(Planner):
         self.define_anesthetists_range_set(self.model)
         self.define_beta_variables(self.model)
         self.define_anesthetists_availability(self.model)
+        self.define_active_indices(self.model)
         self.define_lambda_variables(self.model)
         self.define_y_variables(self.model)
         self.define_gamma_variables(self.model)
@@ -513,43 +608,19 @@ class SimplePlanner(Planner):
 
     def create_model_instance(self, data):
         print("Creating model instance...")
-        t = time.time()
-        self.model_instance = self.model.create_instance(data)
-        elapsed = (time.time() - t)
-        self.cumulated_building_time += elapsed
-
-    def fix_vars(self, model_instance):
-        for i in model_instance.i:
-            if model_instance.a[i] == 0:
-                for alpha in model_instance.alpha:
-                    for t in model_instance.t:
-                        model_instance.beta[alpha, i, t].fix(0)
-            if model_instance.specialty[i] == 1:
-                for k in [3, 4]:
-                    for t in model_instance.t:
-                        model_instance.x[i, k, t].fix(0)
-                        model_instance.delta[1, i, k, t].fix(0)
-                        for alpha in model_instance.alpha:
-                            model_instance.z[1, alpha, i, k, t].fix(0)
-            if model_instance.specialty[i] == 2:
-                for k in [1, 2]:
-                    for t in model_instance.t:
-                        model_instance.x[i, k, t].fix(0)
-                        model_instance.delta[1, i, k, t].fix(0)
-                        for alpha in model_instance.alpha:
-                            model_instance.z[1, alpha, i, k, t].fix(0)
+        with self.instrumentation.phase("create_instance") as record:
+            self.model_instance = self.model.create_instance(data)
+            record["constraints"] = self.instrumentation.constraint_counts(self.model_instance)
+        self.cumulated_building_time += record["wall_time"]
 
     def fix_y_variables(self, model_instance):
         print("Fixing y variables...")
         fixed = 0
-        for k in model_instance.k:
-            for t in model_instance.t:
-                for i1 in range(2, self.model_instance.I + 1):
-                    for i2 in range(1, i1):
-                        if(model_instance.u[i1, i2] == 1):
-                            model_instance.y[i1, i2, k, t].fix(1)
-                            model_instance.y[i2, i1, k, t].fix(0)
-                            fixed += 2
+        for (i1, i2, k, t) in model_instance.y_indices:
+            if(i1 > i2 and self.precedes(model_instance, i1, i2)):
+                model_instance.y[i1, i2, k, t].fix(1)
+                model_instance.y[i2, i1, k, t].fix(0)
+                fixed += 2
         print(str(fixed) + " y variables fixed.")
 
     def extract_run_info(self):
@@ -575,23 +646,44 @@ class SimplePlanner(Planner):
                 "status_ok": self.status_ok,
                 "gap": self.gap,
                 "objective_function_value": self.solution.objective_value,
+                "objective_split": self.compute_objective_split(),
                 "specialty_1_OR_utilization": specialty_1_OR_utilization,
                 "specialty_2_OR_utilization": specialty_2_OR_utilization,
                 "specialty_1_selection_ratio": specialty_1_selection_ratio,
                 "specialty_2_selection_ratio": specialty_2_selection_ratio,
                 "generated_constraints": self.generated_constraints,
                 "discarded_constraints": self.discarded_constraints,
-                "discarded_constraints_ratio": self.discarded_constraints / (self.discarded_constraints + self.generated_constraints)
+                "discarded_constraints_ratio": self.discarded_constraints / (self.discarded_constraints + self.generated_constraints),
+                "phases": self.instrumentation.phases,
+                "phase_totals": self.instrumentation.phase_totals(),
+                "constraint_families": self.instrumentation.constraint_families()
                 }
 
-    def solve_model(self, data):
+    def solve_model(self, data, warm_start=False):
         self.reset_run_info()
-        self.define_model()
-        self.create_model_instance(data)
-        self.fix_vars(self.model_instance)
-        self.fix_y_variables(self.model_instance)
+        if self.can_reuse_instance(self.model_instance, data):
+            with self.instrumentation.phase("update_parameters"):
+                self.update_mutable_parameters(self.model_instance, data)
+        else:
+            if not (self.reuse_model and self.model_defined):
+                with self.instrumentation.phase("define_model"):
+                    self.define_model()
+                self.model_defined = True
+            self.create_model_instance(data)
+            with self.instrumentation.phase("fix_y_variables"):
+                self.fix_y_variables(self.model_instance)
+            self.save_instance_structure(data)
+        if warm_start:
+            with self.instrumentation.phase("warm_start"):
+                self.set_warm_start(self.model_instance, data)
+        self.solve_model_instance(warm_start)
+
+    def solve_model_instance(self, warm_start):
         print("Solving model instance...")
-        self.model.results = self.solver.solve(self.model_instance, tee=True)
+        # the solver's own time is recorded too: the rest of the phase is spent writing the problem and loading results
+        with self.instrumentation.phase("solve") as record:
+            self.model.results = self.solver.solve(self.model_instance, tee=True, warmstart=warm_start)
+            record["solver_time"] = self.solver._last_solve_time
         print("\nModel instance solved.")
         self.solver_time = self.solver._last_solve_time
         resultsAsString = str(self.model.results)
@@ -601,7 +693,258 @@ class SimplePlanner(Planner):
         self.time_limit_hit = self.model.results.solver.termination_condition in [TerminationCondition.maxTimeLimit]
         self.status_ok = self.model.results.solver.status == SolverStatus.ok
 
-        self.solution = Solution(self.model_instance)
+        with self.instrumentation.phase("extract_solution"):
+            self.solution = Solution(self.model_instance)
+        self.report_progress("incumbent", objective_value=self.solution.objective_value, upper_bound=self.upper_bound, solution=self.solution)
+
+
+class LNSPlanner(SimplePlanner):
+    """Fix-and-optimize neighbourhood search on the model of SimplePlanner.
+
+    A first solve, warm-started from the greedy schedule, gives the incumbent (the greedy schedule itself if that
+    solve finds nothing). Then, until the time limit, a
+    neighbourhood (a few consecutive days, or the rooms of one specialty) is freed: the x, delta and beta variables
+    outside of it are fixed to the incumbent, and the sub-MIP is solved with a short time limit. Improvements are
+    accepted, the incumbent is restored otherwise.
+    """
+
+    NEIGHBOURHOODS = ["days", "specialty"]
+    SEARCH_VARIABLES = ['x', 'delta', 'beta', 'gamma', 'y', 'Lambda', 'z']
+
+    def __init__(self, timeLimit, gap, solver, neighbourhood_time_limit=30, neighbourhood_days=2, iterations_cap=None, seed=None):
+        super().__init__(neighbourhood_time_limit, gap, solver)
+        self.total_time_limit = timeLimit
+        self.neighbourhood_time_limit = neighbourhood_time_limit
+        self.neighbourhood_days = neighbourhood_days
+        self.iterations_cap = iterations_cap
+        self.random = random.Random(seed)
+
+    def reset_run_info(self):
+        super().reset_run_info()
+        self.iterations = 0
+        self.improvements = 0
+        self.initial_objective_value = 0
+        self.neighbourhoods = []
+
+    def extract_run_info(self):
+        run_info = super().extract_run_info()
+        run_info.update({"initial_objective_function_value": self.initial_objective_value,
+                         "iterations": self.iterations,
+                         "improvements": self.improvements,
+                         "neighbourhoods": self.neighbourhoods})
+        return run_info
+
+    # (k, t) slots freed by the neighbourhood
+    def draw_neighbourhood(self, model_instance):
+        T = model_instance.T
+        if self.random.choice(LNSPlanner.NEIGHBOURHOODS) == "days":
+            first = self.random.randint(1, max(T - self.neighbourhood_days + 1, 1))
+            days = range(first, min(first + self.neighbourhood_days, T + 1))
+            return ("days", list(days)), {(k, t) for (k, t) in model_instance.eligible_kt if t in days}
+        j = self.random.choice([j for j in model_instance.j if any(model_instance.tau[j, k, t] == 1 for (k, t) in model_instance.eligible_kt)])
+        return ("specialty", j), {(k, t) for (k, t) in model_instance.eligible_kt if model_instance.tau[j, k, t] == 1}
+
+    def save_incumbent(self, model_instance):
+        return {name: {index: variable.value for index, variable in getattr(model_instance, name).items()}
+                for name in LNSPlanner.SEARCH_VARIABLES}
+
+    # the incumbent is also the MIP start of the next sub-MIP
+    def restore_incumbent(self, model_instance, incumbent):
+        for name, values in incumbent.items():
+            variables = getattr(model_instance, name)
+            for index, value in values.items():
+                variables[index].set_value(value)
+
+    def fix_outside(self, model_instance, free_slots):
+        # a patient may have its anesthetist changed only on the days it can be operated on in a free slot
+        free_patient_days = {(i, t) for (i, k, t) in model_instance.eligible_ikt if (k, t) in free_slots}
+        fixed = [model_instance.x[i, k, t] for (i, k, t) in model_instance.eligible_ikt if (k, t) not in free_slots]
+        fixed += [model_instance.delta[q, i, k, t] for (q, i, k, t) in model_instance.eligible_qikt if (k, t) not in free_slots]
+        fixed += [model_instance.beta[alpha, i, t] for (alpha, i, t) in model_instance.beta_indices if (i, t) not in free_patient_days]
+        for variable in fixed:
+            # binaries from the solver can be off by the integrality tolerance
+            variable.fix(round(variable.value or 0))
+        return fixed
+
+    # the Solution is extracted only if someone listens
+    def report_incumbent(self, objective_value, **info):
+        if self.progress_callback is not None:
+            self.report_progress("incumbent", objective_value=objective_value, upper_bound=self.upper_bound, solution=Solution(self.model_instance), **info)
+
+    # returns whether a solution was loaded into the instance
+    def solve_instance(self, time_limit, warm_start):
+        self.solver.options[self.timeLimit] = time_limit
+        with self.instrumentation.phase("solve") as record:
+            results = self.solver.solve(self.model_instance, tee=False, warmstart=warm_start, load_solutions=False)
+            record["solver_time"] = self.solver._last_solve_time
+        self.solver_time += self.solver._last_solve_time
+        self.model.results = results
+        if len(results.solution) == 0:
+            return False
+        self.model_instance.solutions.load_from(results)
+        return True
+
+    def solve_model(self, data, warm_start=True):
+        start_time = time.perf_counter()
+        self.reset_run_info()
+        if not self.model_defined:
+            with self.instrumentation.phase("define_model"):
+                self.define_model()
+            self.model_defined = True
+        self.create_model_instance(data)
+        with self.instrumentation.phase("fix_y_variables"):
+            self.fix_y_variables(self.model_instance)
+        if warm_start:
+            with self.instrumentation.phase("warm_start"):
+                self.set_warm_start(self.model_instance, data)
+
+        print("Solving the whole model for an incumbent...")
+        if self.solve_instance(self.neighbourhood_time_limit, warm_start):
+            resultsAsString = str(self.model.results)
+            self.upper_bound = float(re.search("Upper bound: -*(\d*\.\d*)", resultsAsString).group(1))
+            self.status_ok = self.model.results.solver.status == SolverStatus.ok
+        else:
+            # no solution in time: the greedy schedule is the first incumbent, and no bound is known
+            print("No solution for the whole model: starting from the greedy schedule.")
+            self.upper_bound = inf
+            if not warm_start:
+                with self.instrumentation.phase("warm_start"):
+                    self.set_warm_start(self.model_instance, data)
+        objective_value = pyo.value(self.model_instance.objective)
+        self.initial_objective_value = objective_value
+        incumbent = self.save_incumbent(self.model_instance)
+        self.report_incumbent(objective_value)
+
+        remaining_time = self.total_time_limit - (time.perf_counter() - start_time)
+        while (self.iterations_cap is None or self.iterations < self.iterations_cap) and not self.stop_requested:
+            remaining_time = self.total_time_limit - (time.perf_counter() - start_time)
+            if remaining_time <= 0:
+                break
+            self.iterations += 1
+            neighbourhood, free_slots = self.draw_neighbourhood(self.model_instance)
+            with self.instrumentation.phase("fix_neighbourhood"):
+                fixed = self.fix_outside(self.model_instance, free_slots)
+            loaded = self.solve_instance(min(self.neighbourhood_time_limit, remaining_time), True)
+            for variable in fixed:
+                variable.unfix()
+            if loaded and pyo.value(self.model_instance.objective) > objective_value + 1e-6:
+                objective_value = pyo.value(self.model_instance.objective)
+                incumbent = self.save_incumbent(self.model_instance)
+                self.improvements += 1
+                self.report_incumbent(objective_value, neighbourhood=neighbourhood)
+            else:
+                self.restore_incumbent(self.model_instance, incumbent)
+            self.neighbourhoods.append({"neighbourhood": neighbourhood, "objective_function_value": objective_value})
+
+        self.restore_incumbent(self.model_instance, incumbent)
+        # the bound is the one of the whole model, proven by the first solve
+        self.gap = round((1 - objective_value / self.upper_bound) * 100, 2)
+        self.time_limit_hit = remaining_time <= 0
+        with self.instrumentation.phase("extract_solution"):
+            self.solution = Solution(self.model_instance)
+
+
+class ReplanningPlanner(SimplePlanner):
+    """Rolling-horizon re-planning on the model of SimplePlanner.
+
+    Given the previous Solution, the changes to the waiting list (a PatientDelta) and the frozen days, only the
+    room-days which lost a patient or saw an operating time change are planned again, and the added patients can go
+    in any slot which is not frozen. All the other x, delta and beta variables are fixed to the previous plan, which
+    is also the MIP start; on frozen days, start times and orderings are fixed as well, and operating times cannot
+    change.
+    """
+
+    def __init__(self, timeLimit, gap, solver):
+        super().__init__(timeLimit, gap, solver)
+        self.affected_slots = set()
+        self.free_x_variables = 0
+
+    def extract_run_info(self):
+        run_info = super().extract_run_info()
+        run_info.update({"affected_slots": sorted(self.affected_slots),
+                         "free_x_variables": self.free_x_variables})
+        return run_info
+
+    def replan(self, previous_solution, data, delta, frozen_days=()):
+        frozen_days = set(frozen_days)
+        # a frozen day is kept as it is: its operating times cannot change
+        changed_frozen = sorted(i for (i, k, t) in previous_solution.x if t in frozen_days and i in delta.durations)
+        if changed_frozen:
+            raise ValueError("Operating time changed for patients " + str(changed_frozen) + " on frozen days")
+        self.reset_run_info()
+        new_data, new_index = delta.apply(data)
+        self.affected_slots = {(k, t) for (i, k, t) in previous_solution.x if delta.is_changed(i) and t not in frozen_days}
+        added = set(range(len(new_index) + 1, new_data[None]['I'][None] + 1))
+
+        if not self.model_defined:
+            with self.instrumentation.phase("define_model"):
+                self.define_model()
+            self.model_defined = True
+        self.create_model_instance(new_data)
+        with self.instrumentation.phase("fix_y_variables"):
+            self.fix_y_variables(self.model_instance)
+        with self.instrumentation.phase("warm_start"):
+            self.set_previous_values(self.model_instance, previous_solution, new_index)
+        with self.instrumentation.phase("fix_previous_plan"):
+            self.fix_previous_plan(self.model_instance, added, frozen_days)
+            self.fix_frozen_sequences(self.model_instance, previous_solution, new_index, frozen_days)
+        self.solve_model_instance(True)
+        return new_data
+
+    # the previous plan, with the new patient indices, is the starting point of the solver
+    def set_previous_values(self, model_instance, previous_solution, new_index):
+        slot = {new_index[i]: (k, t) for (i, k, t) in previous_solution.x if i in new_index}
+        order = {new_index[i]: start for i, start in previous_solution.gamma.items() if i in new_index}
+        anesthetist = {(new_index[i], t): alpha for (alpha, i, t) in previous_solution.beta if i in new_index}
+        delayed = {(q, new_index[i], k, t) for (q, i, k, t) in previous_solution.delta if i in new_index}
+
+        def before(i1, i2):
+            return (order.get(i1, 0), i1) < (order.get(i2, 0), i2)
+
+        start_values = {'x': {(i, k, t): int(slot.get(i) == (k, t)) for (i, k, t) in model_instance.eligible_ikt},
+                        'delta': {index: int(index in delayed) for index in model_instance.eligible_qikt},
+                        'beta': {(alpha, i, t): int(anesthetist.get((i, t)) == alpha) for (alpha, i, t) in model_instance.beta_indices},
+                        'z': {(q, alpha, i, k, t): int((q, i, k, t) in delayed and anesthetist.get((i, t)) == alpha) for (q, alpha, i, k, t) in model_instance.z_indices},
+                        'gamma': {i: order.get(i, 0) for i in model_instance.i},
+                        'y': {(i1, i2, k, t): int(before(i1, i2)) for (i1, i2, k, t) in model_instance.y_indices},
+                        'Lambda': {(i1, i2, t): int(before(i1, i2)) for (i1, i2, t) in model_instance.Lambda_indices}}
+        for name, values in start_values.items():
+            variables = getattr(model_instance, name)
+            for index, value in values.items():
+                if not variables[index].fixed:
+                    variables[index].set_value(value)
+
+    # x is free in the affected slots, and for the added patients in any slot which is not frozen; delta follows x,
+    # beta is free on the days where the patient has a free x
+    def fix_previous_plan(self, model_instance, added, frozen_days):
+        free_x = {(i, k, t) for (i, k, t) in model_instance.eligible_ikt
+                  if t not in frozen_days and ((k, t) in self.affected_slots or i in added)}
+        free_patient_days = {(i, t) for (i, k, t) in free_x}
+        self.free_x_variables = len(free_x)
+        for (i, k, t) in model_instance.eligible_ikt:
+            if (i, k, t) not in free_x:
+                model_instance.x[i, k, t].fix()
+        for (q, i, k, t) in model_instance.eligible_qikt:
+            if (i, k, t) not in free_x:
+                model_instance.delta[q, i, k, t].fix()
+        for (alpha, i, t) in model_instance.beta_indices:
+            if (i, t) not in free_patient_days:
+                model_instance.beta[alpha, i, t].fix()
+
+    # on frozen days the start times and orderings are kept too, not only the assignments
+    def fix_frozen_sequences(self, model_instance, previous_solution, new_index, frozen_days):
+        for (i, k, t) in previous_solution.x:
+            if t in frozen_days and i in new_index:
+                model_instance.gamma[new_index[i]].fix()
+        for (i1, i2, k, t) in model_instance.y_indices:
+            if t in frozen_days:
+                model_instance.y[i1, i2, k, t].fix()
+        for (i1, i2, t) in model_instance.Lambda_indices:
+            if t in frozen_days:
+                model_instance.Lambda[i1, i2, t].fix()
+        for (q, alpha, i, k, t) in model_instance.z_indices:
+            if t in frozen_days:
+                model_instance.z[q, alpha, i, k, t].fix()
 
 
 class TwoPhasePlanner(Planner):
@@ -612,6 +955,9 @@ class TwoPhasePlanner(Planner):
         self.MP_instance = None
         self.SP_model = pyo.AbstractModel()
         self.SP_instance = None
+        # when set, the MP instance stays loaded in the solver between iterations
+        self.persistent_MP_solver = None
+        self.warm_start = False
 
     def define_model(self):
         self.define_MP()
@@ -623,6 +969,7 @@ class TwoPhasePlanner(Planner):
     def define_MP(self):
         self.define_sets(self.MP_model)
         self.define_parameters(self.MP_model)
+        self.define_eligible_indices(self.MP_model)
         self.define_x_variables(self.MP_model)
         self.define_delta_variables(self.MP_model)
         self.define_single_delay_constraints(self.MP_model)
@@ -654,6 +1001,7 @@ class TwoPhasePlanner(Planner):
     def define_SP(self):
         self.define_sets(self.SP_model)
         self.define_parameters(self.SP_model)
+        self.define_eligible_indices(self.SP_model)
         self.define_x_variables(self.SP_model)
         self.define_delta_variables(self.SP_model)
         self.define_single_delay_constraints(self.SP_model)
@@ -675,6 +1023,7 @@ class TwoPhasePlanner(Planner):
         # SP's components
         self.define_x_parameters()
         self.define_status_parameters()
+        self.define_active_indices(self.SP_model)
         self.define_lambda_variables(self.SP_model)
         self.define_y_variables(self.SP_model)
         self.define_gamma_variables(self.SP_model)
@@ -687,26 +1036,37 @@ class TwoPhasePlanner(Planner):
 
     def create_MP_instance(self, data):
         print("Creating MP instance...")
-        t = time.time()
-        self.MP_instance = self.MP_model.create_instance(data)
-        elapsed = (time.time() - t)
-        print("MP instance created in " + str(round(elapsed, 2)) + "s")
-        self.cumulated_building_time += elapsed
+        with self.instrumentation.phase("create_MP_instance") as record:
+            self.MP_instance = self.MP_model.create_instance(data)
+            record["constraints"] = self.instrumentation.constraint_counts(self.MP_instance)
+        print("MP instance created in " + str(round(record["wall_time"], 2)) + "s")
+        self.cumulated_building_time += record["wall_time"]
 
     def create_SP_instance(self, data):
-        self.extend_data(data)
+        with self.instrumentation.phase("extend_data"):
+            self.extend_data(data)
         print("Creating SP instance...")
-        t = time.time()
-        self.SP_instance = self.SP_model.create_instance(data)
-        elapsed = (time.time() - t)
-        print("SP instance created in " + str(round(elapsed, 2)) + "s")
-        self.cumulated_building_time += elapsed
+        with self.instrumentation.phase("create_SP_instance") as record:
+            self.SP_instance = self.SP_model.create_instance(data)
+            record["constraints"] = self.instrumentation.constraint_counts(self.SP_instance)
+        print("SP instance created in " + str(round(record["wall_time"], 2)) + "s")
+        self.cumulated_building_time += record["wall_time"]
 
     def solve_MP(self):
         print("Solving MP instance...")
-        self.MP_model.results = self.solver.solve(self.MP_instance, tee=True)
+        with self.instrumentation.phase("solve_MP") as record:
+            record["time_limit"] = self.solver.options[self.timeLimit]
+            if self.persistent_MP_solver:
+                self.persistent_MP_solver.options['timelimit'] = self.solver.options[self.timeLimit]
+                # the current values of the MP variables (previous incumbent) are passed as a MIP start
+                self.MP_model.results = self.persistent_MP_solver.solve(tee=True, warmstart=True)
+                self.MP_solve_time = self.MP_model.results.solver.wallclock_time
+            else:
+                self.MP_model.results = self.solver.solve(self.MP_instance, tee=True, warmstart=self.warm_start)
+                self.MP_solve_time = self.solver._last_solve_time
+            record["solver_time"] = self.MP_solve_time
         print("\nMP instance solved.")
-        self.solver_time += self.solver._last_solve_time
+        self.solver_time += self.MP_solve_time
         self.MP_time_limit_hit = self.MP_model.results.solver.termination_condition in [TerminationCondition.maxTimeLimit]
         self.MP_objective_function_value = pyo.value(self.MP_instance.objective)
 
@@ -717,35 +1077,77 @@ class TwoPhasePlanner(Planner):
 
     def solve_SP(self):
         print("Solving SP instance...")
-        self.SP_model.results = self.solver.solve(self.SP_instance, tee=True)
+        with self.instrumentation.phase("solve_SP") as record:
+            self.SP_model.results = self.solver.solve(self.SP_instance, tee=True)
+            record["solver_time"] = self.solver._last_solve_time
         print("SP instance solved.")
         self.solver_time += self.solver._last_solve_time
-        self.time_limit_hit = self.SP_model.results.solver.termination_condition in [
-            TerminationCondition.maxTimeLimit]
+        self.SP_status = self.SP_model.results.solver.status
+        self.SP_termination_condition = self.SP_model.results.solver.termination_condition
+        self.time_limit_hit = self.SP_termination_condition in [TerminationCondition.maxTimeLimit]
 
 class LBBDPlanner(TwoPhasePlanner):
 
-    def __init__(self, timeLimit, gap, iterations_cap, solver):
+    # parameters indexed by day as their last index: a single-day SP only receives its own day's values
+    DAY_INDEXED_PARAMETERS = ['s', 'An', 'Gamma', 'tau', 'status', 'x_param']
+
+    def __init__(self, timeLimit, gap, iterations_cap, solver, persistent=False, parallel_SP=False, SP_workers=None, reuse_model=False, sequencing=False, sequencing_node_budget=20000, day_cuts=False):
         super().__init__(timeLimit, gap, solver)
         self.iterations_cap = iterations_cap
+        # only the MP can be reused: the SP depends on the MP solution
+        self.reuse_model = reuse_model
+        if persistent:
+            self.persistent_MP_solver = self.create_persistent_solver(solver, gap)
+        # once x is fixed, no SP component links different days: the SP can be solved as T single-day problems
+        self.parallel_SP = parallel_SP
+        self.SP_workers = SP_workers
+        self.SP_gap = gap
+        self.solver_name = solver
+        # the MP assignments are first sequenced by a search over each day, the SP MIP is solved only if the search is inconclusive
+        self.sequencing = sequencing
+        self.sequencing_node_budget = sequencing_node_budget
+        # no-good cuts only over the assignments of the days which failed, shrunk by the day sequencer
+        self.day_cuts = day_cuts
+
+    def create_persistent_solver(self, solver, gap):
+        if(solver == "cplex"):
+            persistent_solver = pyo.SolverFactory("cplex_persistent")
+            persistent_solver.options['emphasis_mip'] = 3
+            persistent_solver.options['mip_tolerances_mipgap'] = gap
+        elif(solver == "gurobi"):
+            persistent_solver = pyo.SolverFactory("gurobi_persistent")
+            persistent_solver.options['mipfocus'] = 2
+            persistent_solver.options['mipgap'] = gap
+        else:
+            raise ValueError("No persistent interface available for solver " + solver)
+        return persistent_solver
 
     @abstractmethod
     def extend_data(self, data):
         pass
 
+    # SP variables to be fixed, as {variable name: {index: value}}
     @abstractmethod
-    def fix_SP_variables(self):
+    def SP_fixed_values(self, data):
         pass
 
+    def fix_SP_variables(self, SP_instance, fixed_values):
+        print("Fixing x variables for phase two...")
+        for name, values in fixed_values.items():
+            variables = getattr(SP_instance, name)
+            for index, value in values.items():
+                variables[index].fix(value)
+        print(str(len(fixed_values['x'])) + " x variables fixed.")
+
     def has_solution(self):
-        return self.SP_model.results.solver.termination_condition in {TerminationCondition.feasible,
-                                                                      TerminationCondition.optimal,
-                                                                      TerminationCondition.maxTimeLimit
-                                                                     }
+        return self.SP_termination_condition in {TerminationCondition.feasible,
+                                                 TerminationCondition.optimal,
+                                                 TerminationCondition.maxTimeLimit
+                                                }
 
     def solve_MP(self):
         super().solve_MP()
-        residual_time = self.solver.options[self.timeLimit] - self.solver._last_solve_time
+        residual_time = self.solver.options[self.timeLimit] - self.MP_solve_time
         if residual_time <= 0:
             self.last_round = True
             self.solver.options[self.timeLimit] = 10 # leave 10 seconds for solving the last SP
@@ -754,12 +1156,124 @@ class LBBDPlanner(TwoPhasePlanner):
 
     def solve_SP(self):
         super().solve_SP()
-        residual_time = self.solver.options[self.timeLimit] - self.solver._last_solve_time
+        self.update_SP_residual_time(self.solver._last_solve_time)
+
+    def update_SP_residual_time(self, elapsed):
+        residual_time = self.solver.options[self.timeLimit] - elapsed
         if residual_time <= 0:
             self.last_round = True
         else:
             self.solver.options[self.timeLimit] = residual_time
 
+    def create_day_data(self, data, t):
+        day_data = dict(data[None])
+        day_data['T'] = {None: 1}
+        for name in LBBDPlanner.DAY_INDEXED_PARAMETERS:
+            if name in day_data:
+                day_data[name] = self.restrict_to_day(day_data[name], t)
+        return {None: day_data}
+
+    # keep the entries of day t, re-indexed as day 1
+    def restrict_to_day(self, values, t):
+        return {index[:-1] + (1,): value for index, value in values.items() if index[-1] == t}
+
+    def solve_SP_by_day(self, data):
+        with self.instrumentation.phase("extend_data"):
+            self.extend_data(data)
+            fixed_values = self.SP_fixed_values(data)
+        T = pyo.value(self.MP_instance.T)
+        print("Solving SP by day...")
+        with self.instrumentation.phase("solve_SP_by_day") as record:
+            with ProcessPoolExecutor(max_workers=self.SP_workers) as executor:
+                futures = [executor.submit(solve_SP_day,
+                                           type(self),
+                                           self.solver.options[self.timeLimit],
+                                           self.SP_gap,
+                                           self.solver_name,
+                                           self.create_day_data(data, t),
+                                           {name: self.restrict_to_day(values, t) for name, values in fixed_values.items()})
+                           for t in range(1, T + 1)]
+                results = [future.result() for future in futures]
+        elapsed = record["wall_time"]
+        print("SP solved by day in " + str(round(elapsed, 2)) + "s")
+
+        for t, result in enumerate(results, start=1):
+            self.instrumentation.merge(result["phases"], result["discarded_constraints_by_family"], iteration=self.iterations, day=t)
+
+        # days are solved concurrently: only the slowest one adds to the elapsed time
+        self.cumulated_building_time += max(result["building_time"] for result in results)
+        self.solver_time += max(result["solver_time"] for result in results)
+        self.generated_constraints += sum(result["generated_constraints"] for result in results)
+        self.discarded_constraints += sum(result["discarded_constraints"] for result in results)
+
+        self.SP_day_solutions = [result["solution"] for result in results]
+        self.time_limit_hit = any(result["termination_condition"] == TerminationCondition.maxTimeLimit for result in results)
+        self.SP_status = next((result["status"] for result in results if result["status"] != SolverStatus.ok), SolverStatus.ok)
+        self.SP_termination_condition = next((result["termination_condition"] for result in results if result["solution"] is None),
+                                             TerminationCondition.maxTimeLimit if self.time_limit_hit else TerminationCondition.optimal)
+        self.update_SP_residual_time(elapsed)
+
+    # (id, room, duration, precedence, anesthesia) of the patients planned by the MP, by day
+    def MP_day_patients(self):
+        day_patients = {t: [] for t in self.MP_instance.t}
+        for (i, k, t) in self.MP_instance.eligible_ikt:
+            if round(self.MP_instance.x[i, k, t].value) == 1:
+                duration = pyo.value(self.MP_instance.p[i]) + sum(pyo.value(self.MP_instance.d[q, i]) * round(self.MP_instance.delta[q, i, k, t].value) for q in self.MP_instance.q)
+                day_patients[t].append((i, k, duration, pyo.value(self.MP_instance.precedence[i]), pyo.value(self.MP_instance.a[i]) == 1))
+        return day_patients
+
+    def day_sequencer(self, t):
+        return DaySequencer({k: pyo.value(self.MP_instance.s[k, t]) for k in self.MP_instance.k},
+                            {alpha: pyo.value(self.MP_instance.An[alpha, t]) for alpha in self.MP_instance.alpha},
+                            self.sequencing_node_budget)
+
+    # returns False unless every day could be sequenced: the SP must then still be solved
+    def sequence_MP_solution(self):
+        print("Sequencing MP solution...")
+        with self.instrumentation.phase("sequence_SP") as record:
+            status = FEASIBLE
+            schedule = {}
+            record["nodes"] = 0
+            for t, patients in self.MP_day_patients().items():
+                sequencer = self.day_sequencer(t)
+                day_status, day_schedule = sequencer.sequence(patients)
+                record["nodes"] += sequencer.nodes
+                if day_status == FEASIBLE:
+                    schedule.update(day_schedule)
+                elif day_status == INFEASIBLE:
+                    status = INFEASIBLE
+                    break
+                else:
+                    status = BUDGET_EXHAUSTED
+            record["status"] = status
+        print("MP solution sequenced in " + str(round(record["wall_time"], 2)) + "s: " + status)
+        self.update_SP_residual_time(record["wall_time"])
+
+        if status == FEASIBLE:
+            # all the MP patients are sequenced: the SP reaches the MP objective value
+            self.sequenced_solution = Solution.from_schedule(self.MP_instance, schedule)
+            self.SP_status = SolverStatus.ok
+            self.SP_termination_condition = TerminationCondition.optimal
+        else:
+            # an infeasible verdict is left to the SP MIP to prove, before any cut relies on it
+            return False
+        self.time_limit_hit = False
+        return True
+
+    def SP_objective_value(self):
+        if self.sequenced_solution:
+            return self.sequenced_solution.objective_value
+        if self.SP_day_solutions:
+            return sum(solution.objective_value for solution in self.SP_day_solutions)
+        return pyo.value(self.SP_instance.objective)
+
+    def SP_solution(self):
+        if self.sequenced_solution:
+            return self.sequenced_solution
+        if self.SP_day_solutions:
+            return Solution.merge_days(self.SP_day_solutions)
+        return Solution(self.SP_instance)
+
     def extract_run_info(self):
         OR_utilization_by_specialty = self.compute_operating_room_utilization_by_specialty()
         specialty_selection_ratio = self.compute_specialty_selection_ratio()
@@ -784,6 +1298,7 @@ class LBBDPlanner(TwoPhasePlanner):
                 "gap": self.gap,
                 "MP_objective_function_value": self.MP_objective_function_value,
                 "objective_function_value": self.objective_function_value,
+                "objective_split": self.compute_objective_split(),
                 "MP_upper_bound": self.MP_upper_bound,
                 "MP_time_limit_hit": self.MP_time_limit_hit,
                 "time_limit_hit": self.time_limit_hit,
@@ -794,15 +1309,18 @@ class LBBDPlanner(TwoPhasePlanner):
                 "specialty_2_selection_ratio": specialty_2_selection_ratio,
                 "generated_constraints": self.generated_constraints,
                 "discarded_constraints": self.discarded_constraints,
-                "discarded_constraints_ratio": self.discarded_constraints / (self.discarded_constraints + self.generated_constraints)
+                "discarded_constraints_ratio": self.discarded_constraints / (self.discarded_constraints + self.generated_constraints),
+                "phases": self.instrumentation.phases,
+                "phase_totals": self.instrumentation.phase_totals(),
+                "constraint_families": self.instrumentation.constraint_families()
                 }
 
     def is_optimal(self):
-        return isclose(pyo.value(self.MP_instance.objective), pyo.value(self.SP_instance.objective))
+        return isclose(pyo.value(self.MP_instance.objective), self.SP_objective_value())
 
     def MP_anesthetist_time_rule(self, model, t):
         self.generated_constraints += 1
-        return sum(model.a[i] * model.p[i] * model.x[i, k, t] for i in model.i for k in model.k) + sum(model.a[i] * model.d[q, i] * model.delta[q, i, k, t] for i in model.i for k in model.k for q in model.q) <= sum(model.An[alpha, t] for alpha in model.alpha)
+        return sum(model.a[i] * model.p[i] * model.x[i, k, t] for i in model.i for k in model.k if (i, k, t) in model.eligible_ikt) + sum(model.a[i] * model.d[q, i] * model.delta[q, i, k, t] for i in model.i for k in model.k for q in model.q if (i, k, t) in model.eligible_ikt) <= sum(model.An[alpha, t] for alpha in model.alpha)
 
     def define_MP_anesthetist_time_constraint(self, model):
         model.MP_anesthetist_time_constraint = pyo.Constraint(
@@ -813,96 +1331,164 @@ class LBBDPlanner(TwoPhasePlanner):
         # self.MP_instance.objective_function_cuts.clear()
 
         N = (sum(self.MP_instance.r[i] for i in self.MP_instance.i))
-        R = sum(self.MP_instance.x[i, k, t] * self.MP_instance.r[i] for i in self.MP_instance.i for k in self.MP_instance.k for t in self.MP_instance.t)
-        D = sum(self.MP_instance.d[q, i] * self.MP_instance.delta[q, i, k, t] for i in self.MP_instance.i for k in self.MP_instance.k for t in self.MP_instance.t for q in self.MP_instance.q)
+        R = sum(self.MP_instance.x[i, k, t] * self.MP_instance.r[i] for (i, k, t) in self.MP_instance.eligible_ikt)
+        D = sum(self.MP_instance.d[q, i] * self.MP_instance.delta[q, i, k, t] for (q, i, k, t) in self.MP_instance.eligible_qikt)
         M = sum(self.MP_instance.d[q, i] for i in self.MP_instance.i for q in self.MP_instance.q)        
         cut = D + R / N <= pyo.value(self.MP_instance.objective)
 
-        self.MP_instance.objective_function_cuts.add(cut)
+        self.add_MP_cut(self.MP_instance.objective_function_cuts, cut)
 
     def add_patients_cut(self):
-        self.MP_instance.patients_cuts.add(sum(
-            1 - self.MP_instance.x[i, k, t] for i in self.MP_instance.i for k in self.MP_instance.k for t in self.MP_instance.t if round(self.MP_instance.x[i, k, t].value) == 1) >= 1)
-
-        self.MP_instance.patients_cuts.display()
+        self.add_MP_cut(self.MP_instance.patients_cuts, sum(
+            1 - self.MP_instance.x[i, k, t] for (i, k, t) in self.MP_instance.eligible_ikt if round(self.MP_instance.x[i, k, t].value) == 1) >= 1)
+
+    # days which the sequencer could not sequence: candidates for a cut, to be proven by the single-day SP
+    def failed_days(self, day_patients):
+        return [t for t, patients in day_patients.items() if patients and self.day_sequencer(t).sequence(patients)[0] != FEASIBLE]
+
+    # greedy deletion: a patient leaves the conflict whenever the remaining ones still cannot be sequenced
+    def minimal_conflict(self, t, patients):
+        sequencer = self.day_sequencer(t)
+        if sequencer.sequence(patients)[0] != INFEASIBLE:
+            return patients
+        conflict = list(patients)
+        # shortest patients first: they are the least likely to be needed in the conflict
+        for patient in sorted(patients, key=lambda patient: patient[2]):
+            reduced = [other for other in conflict if other is not patient]
+            if sequencer.sequence(reduced)[0] == INFEASIBLE:
+                conflict = reduced
+        return conflict
+
+    # whether the single-day SP, with only the given MP assignments of day t, is proven infeasible
+    def day_SP_infeasible(self, data, t, patients):
+        selected = {(i, k) for (i, k, _, _, _) in patients}
+        fixed_values = {'x': {}, 'delta': {}}
+        for (i, k, day) in self.MP_instance.eligible_ikt:
+            if day != t:
+                continue
+            x = int((i, k) in selected)
+            fixed_values['x'][(i, k, 1)] = x
+            for q in self.MP_instance.q:
+                fixed_values['delta'][(q, i, k, 1)] = x * round(self.MP_instance.delta[q, i, k, t].value)
+        with self.instrumentation.phase("prove_day_conflict") as record:
+            result = solve_SP_day(type(self), self.solver.options[self.timeLimit], self.SP_gap, self.solver_name, self.create_day_data(data, t), fixed_values)
+        self.update_SP_residual_time(record["wall_time"])
+        return result["termination_condition"] in {TerminationCondition.infeasible, TerminationCondition.infeasibleOrUnbounded}
+
+    # no-good cuts restricted to the days which failed, each one proven by the single-day SP (the shrunk conflict
+    # if possible, else the whole day); falls back to the global no-good if none is proven
+    def add_day_cuts(self, data):
+        day_patients = self.MP_day_patients()
+        self.extend_data(data)
+        cuts = 0
+        for t in self.failed_days(day_patients):
+            conflict = self.minimal_conflict(t, day_patients[t])
+            if not self.day_SP_infeasible(data, t, conflict):
+                if len(conflict) == len(day_patients[t]) or not self.day_SP_infeasible(data, t, day_patients[t]):
+                    continue
+                conflict = day_patients[t]
+            self.add_MP_cut(self.MP_instance.patients_cuts, sum(1 - self.MP_instance.x[i, k, t] for (i, k, _, _, _) in conflict) >= 1)
+            print("Day " + str(t) + " cut: " + str(len(conflict)) + " of " + str(len(day_patients[t])) + " patients.")
+            cuts += 1
+        if cuts == 0:
+            self.add_patients_cut()
+
+    # a persistent solver only receives the new row, instead of re-reading the whole MP
+    def add_MP_cut(self, cuts, expression):
+        cut = cuts.add(expression)
+        if self.persistent_MP_solver:
+            self.persistent_MP_solver.add_constraint(cut)
 
     def save_best_solution(self):
-        SP_objective_value = pyo.value(self.SP_instance.objective)
+        SP_objective_value = self.SP_objective_value()
         if SP_objective_value > self.best_SP_solution_value:
             self.best_SP_solution_value = SP_objective_value
-            self.solution = Solution(self.SP_instance)
+            with self.instrumentation.phase("extract_solution"):
+                self.solution = self.SP_solution()
+            self.report_progress("incumbent", objective_value=SP_objective_value, upper_bound=self.MP_least_upper_bound, solution=self.solution)
 
-    def fix_MP_vars(self):
-        for i in self.MP_instance.i:
-            if self.MP_instance.a[i] == 0:
-                for alpha in self.MP_instance.alpha:
-                    for t in self.MP_instance.t:
-                        self.MP_instance.beta[alpha, i, t].fix(0)
-            if self.MP_instance.specialty[i] == 1:
-                for k in [3, 4]:
-                    for t in self.MP_instance.t:
-                        self.MP_instance.x[i, k, t].fix(0)
-                        self.MP_instance.delta[1, i, k, t].fix(0)
-                        for alpha in self.MP_instance.alpha:
-                            self.MP_instance.z[1, alpha, i, k, t].fix(0)
-            if self.MP_instance.specialty[i] == 2:
-                for k in [1, 2]:
-                    for t in self.MP_instance.t:
-                        self.MP_instance.x[i, k, t].fix(0)
-                        self.MP_instance.delta[1, i, k, t].fix(0)
-                        for alpha in self.MP_instance.alpha:
-                            self.MP_instance.z[1, alpha, i, k, t].fix(0)
-
-    def solve_model(self, data):
+    def solve_model(self, data, warm_start=False):
         self.reset_run_info()
-        self.define_model()
-        self.create_MP_instance(data)
+        self.reset_time_limit()
+        if self.persistent_MP_solver:
+            self.persistent_MP_solver.options['timelimit'] = self.configured_time_limit
+        if self.can_reuse_instance(self.MP_instance, data):
+            with self.instrumentation.phase("update_parameters"):
+                self.update_mutable_parameters(self.MP_instance, data)
+                # cuts belong to the previous run
+                self.MP_instance.del_component(self.MP_instance.patients_cuts)
+                self.MP_instance.del_component(self.MP_instance.objective_function_cuts)
+        else:
+            if not (self.reuse_model and self.model_defined):
+                with self.instrumentation.phase("define_model"):
+                    self.define_model()
+                self.model_defined = True
+            self.create_MP_instance(data)
+            self.save_instance_structure(data)
         self.MP_instance.patients_cuts = pyo.ConstraintList()
         self.MP_instance.objective_function_cuts = pyo.ConstraintList()
+        # later MP solves start from the previous MP solution
+        self.warm_start = warm_start
+        if warm_start:
+            with self.instrumentation.phase("warm_start"):
+                self.set_warm_start(self.MP_instance, data)
+        if self.persistent_MP_solver:
+            with self.instrumentation.phase("load_persistent_MP"):
+                self.persistent_MP_solver.set_instance(self.MP_instance)
         self.selected_x_indices = set()
 
         self.iterations = 0
         self.last_round = False
         self.solution = None
+        self.SP_status = None
         self.MP_least_upper_bound = inf
         self.best_SP_solution_value = 0
 
         self.objective_values = []
-        self.D_ikt = []
-        self.NR = []
 
-        while self.iterations < self.iterations_cap:
+        while self.iterations < self.iterations_cap and not self.stop_requested:
             self.iterations += 1
+            self.instrumentation.iteration = self.iterations
             # MP
-            self.fix_MP_vars()
             self.solve_MP()
 
             if self.MP_upper_bound < self.MP_least_upper_bound:
                 self.MP_least_upper_bound = self.MP_upper_bound
+                self.report_progress("bound", upper_bound=self.MP_least_upper_bound, MP_objective_value=self.MP_objective_function_value,
+                                     objective_value=self.best_SP_solution_value)
 
             # SP
-            self.create_SP_instance(data)
-            self.fix_SP_variables()
-            self.solve_SP()
+            self.sequenced_solution = None
+            self.SP_day_solutions = None
+            if self.sequencing and self.sequence_MP_solution():
+                pass
+            elif self.parallel_SP:
+                self.solve_SP_by_day(data)
+            else:
+                self.create_SP_instance(data)
+                with self.instrumentation.phase("fix_SP_variables"):
+                    self.fix_SP_variables(self.SP_instance, self.SP_fixed_values(data))
+                self.solve_SP()
 
             if self.has_solution():
                 self.save_best_solution()
 
             if (not self.has_solution() or not self.is_optimal()) and not self.last_round:
-                # depending on the variables' fixing rule, this cut assumes a different meaning
-                # guaranteed_feasibility -> optimality cut
-                # fix_all -> feasibility cut
-                self.add_patients_cut()
-                # this cut has no feasibility/optimality meaning: it simply helps in achieving faster computation times
-                self.add_objective_cut()
+                with self.instrumentation.phase("add_cuts"):
+                    # depending on the variables' fixing rule, this cut assumes a different meaning
+                    # guaranteed_feasibility -> optimality cut
+                    # fix_all -> feasibility cut
+                    if self.day_cuts:
+                        self.add_day_cuts(data)
+                    else:
+                        self.add_patients_cut()
+                    # this cut has no feasibility/optimality meaning: it simply helps in achieving faster computation times
+                    self.add_objective_cut()
             else:
                 break
 
-        self.status_ok = self.SP_model.results and self.SP_model.results.solver.status == SolverStatus.ok
+        self.status_ok = self.SP_status == SolverStatus.ok
         self.compute_gap_and_solution_value()
-        print(self.objective_values)
-        print(self.D_ikt)
-        print(self.NR)
 
     def compute_gap_and_solution_value(self):
         self.objective_function_value = None
@@ -918,86 +1504,16 @@ class LBBDPlanner(TwoPhasePlanner):
 
 class HeuristicLBBDPlanner(LBBDPlanner):
 
-    def anesthetist_no_overlap_rule(self, model, i1, i2, k1, k2, t, alpha):
-        if(model.status[i1, k1, t] == Planner.DISCARDED or model.status[i2, k2, t] == Planner.DISCARDED):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2 or k1 == k2 or model.a[i1] * model.a[i2] == 0):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k1, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (5 - model.beta[alpha, i1, t] - model.beta[alpha, i2, t] - model.x[i1, k1, t] - model.x[i2, k2, t] - model.Lambda[i1, i2, t])
-
-    def end_of_day_rule(self, model, i, k, t):
-        if(model.status[i, k, t] == Planner.DISCARDED):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if((model.specialty[i] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i] + model.p[i] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) <= model.s[k, t]
-
-    def time_ordering_precedence_rule(self, model, i1, i2, k, t):
-        if(model.status[i1, k, t] == Planner.DISCARDED or model.status[i2, k, t] == Planner.DISCARDED):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (3 - model.x[i1, k, t] - model.x[i2, k, t] - model.y[i1, i2, k, t])
-
-    def start_time_ordering_priority_rule(self, model, i1, i2, k, t):
-        if(model.status[i1, k, t] == Planner.DISCARDED or model.status[i2, k, t] == Planner.DISCARDED):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2 or model.u[i1, i2] == 0
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] * model.u[i1, i2] <= model.gamma[i2] * (1 - model.u[i2, i1]) + model.bigM[2] * (2 - model.x[i1, k, t] - model.x[i2, k, t])
-
-    def exclusive_precedence_rule(self, model, i1, i2, k, t):
-        if(model.specialty[i1] != model.specialty[i2]):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(model.status[i1, k, t] == Planner.DISCARDED or model.status[i2, k, t] == Planner.DISCARDED):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 >= i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.y[i1, i2, k, t] + model.y[i2, i1, k, t] == 1
-
-    def lambda_rule(self, model, i1, i2, t):
-        if(i1 >= i2 or not (model.a[i1] == 1 and model.a[i2] == 1)):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        # if patients not on same day
-        if(all(model.status[i1, k, t] == Planner.DISCARDED for k in model.k) or all(model.status[i2, k, t] == Planner.DISCARDED for k in model.k)):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.Lambda[i1, i2, t] + model.Lambda[i2, i1, t] == 1
+    # patients planned by the MP on day t are free to be sequenced in any room of that day
+    def is_active(self, model, i, k, t):
+        return model.status[i, k, t] == Planner.FREE
 
     def extend_data(self, data):
         status_dict = {}
         for i in self.MP_instance.i:
             for t in self.MP_instance.t:
                 # if patient is planned for day t, we allow her to be free in that day
-                if(sum(round(self.MP_instance.x[i, k, t].value) for k in self.MP_instance.k) == 1):
+                if(sum(round(self.MP_instance.x[i, k, t].value) for k in self.MP_instance.k if (i, k, t) in self.MP_instance.eligible_ikt) == 1):
                     for k in range(1, self.MP_instance.K + 1):
                         status_dict[(i, k, t)] = Planner.FREE
                 # otherwise she is discarded, i.e. we do not allow her to be re-planned to another day t' != t
@@ -1006,138 +1522,71 @@ class HeuristicLBBDPlanner(LBBDPlanner):
                         status_dict[(i, k, t)] = Planner.DISCARDED
         data[None]['status'] = status_dict
 
-    def fix_SP_variables(self):
-        print("Fixing x variables for phase two...")
-        fixed = 0
-        for k in self.MP_instance.k:
-            for t in self.MP_instance.t:
-                for i in self.MP_instance.i:
-                    if(self.SP_instance.status[i, k, t] == Planner.DISCARDED):
-                        self.SP_instance.x[i, k, t].fix(0)
-                        for q in self.SP_instance.q:
-                            self.SP_instance.delta[q, i, k, t].fix(0)
-                        fixed += 1
-        print(str(fixed) + " x variables fixed.")
-
-    def fix_MP_delta_variables(self):
-        print("Fixing delta variables for phase one...")
-        fixed = 0
-        for q in self.MP_instance.q:
-            for k in self.MP_instance.k:
-                for t in self.MP_instance.t:
-                    for i in self.MP_instance.i:
-                        if(self.MP_instance.specialty[i] == 1 and k in [3, 4] or self.MP_instance.specialty[i] == 2 and k in [1, 2]):
-                            self.MP_instance.delta[q, i, k, t].fix(0)
-                            fixed += 1
-        print(str(fixed) + " delta variables fixed.")
-
-    def fix_MP_x_variables(self):
-        print("Fixing x variables for phase one...")
-        fixed = 0
-        for k in self.MP_instance.k:
-            for t in self.MP_instance.t:
-                for i in self.MP_instance.i:
-                    if(self.MP_instance.specialty[i] == 1 and k in [3, 4] or self.MP_instance.specialty[i] == 2 and k in [1, 2]):
-                        self.MP_instance.x[i, k, t].fix(0)
-                        fixed += 1
-        print(str(fixed) + " x variables fixed.")
+    def SP_fixed_values(self, data):
+        fixed_values = {'x': {}, 'delta': {}}
+        for (i, k, t) in self.MP_instance.eligible_ikt:
+            if(data[None]['status'][(i, k, t)] == Planner.DISCARDED):
+                fixed_values['x'][(i, k, t)] = 0
+                for q in self.MP_instance.q:
+                    fixed_values['delta'][(q, i, k, t)] = 0
+        return fixed_values
 
 
 class VanillaLBBDPlanner(LBBDPlanner):
 
-    def anesthetist_no_overlap_rule(self, model, i1, i2, k1, k2, t, alpha):
-        if(model.x_param[i1, k1, t] + model.x_param[i2, k2, t] < 2):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2 or k1 == k2 or model.a[i1] * model.a[i2] == 0):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k1, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (5 - model.beta[alpha, i1, t] - model.beta[alpha, i2, t] - model.x[i1, k1, t] - model.x[i2, k2, t] - model.Lambda[i1, i2, t])
-
-    def end_of_day_rule(self, model, i, k, t):
-        if(model.x_param[i, k, t] == 0):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if((model.specialty[i] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i] + model.p[i] + sum(model.d[q, i] * model.delta[q, i, k, t] for q in model.q) <= model.s[k, t]
-
-    def time_ordering_precedence_rule(self, model, i1, i2, k, t):
-        if( model.x_param[i1, k, t] + model.x_param[i2, k, t] < 2):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] + model.p[i1] + sum(model.d[q, i1] * model.delta[q, i1, k, t] for q in model.q) <= model.gamma[i2] + model.bigM[2] * (3 - model.x[i1, k, t] - model.x[i2, k, t] - model.y[i1, i2, k, t])
-
-    def start_time_ordering_priority_rule(self, model, i1, i2, k, t):
-        if( model.x_param[i1, k, t] + model.x_param[i2, k, t] < 2):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 == i2 or model.u[i1, i2] == 0
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.gamma[i1] * model.u[i1, i2] <= model.gamma[i2] * (1 - model.u[i2, i1]) + model.bigM[2] * (2 - model.x[i1, k, t] - model.x[i2, k, t])
-
-    def exclusive_precedence_rule(self, model, i1, i2, k, t):
-        if(model.x_param[i1, k, t] + model.x_param[i2, k, t] < 2):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        if(i1 >= i2
-           or (model.specialty[i1] != model.specialty[i2])
-           or (model.specialty[i1] == 1 and (k == 3 or k == 4))
-           or (model.specialty[i1] == 2 and (k == 1 or k == 2))):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.y[i1, i2, k, t] + model.y[i2, i1, k, t] == 1
-
-    def lambda_rule(self, model, i1, i2, t):
-        if(i1 >= i2 or not (model.a[i1] == 1 and model.a[i2] == 1)):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        # if patients not on same day
-        if(sum(model.x_param[i1, k, t] for k in model.k) == 0 or sum(model.x_param[i2, k, t] for k in model.k) == 0):
-            self.discarded_constraints += 1
-            return pyo.Constraint.Skip
-        self.generated_constraints += 1
-        return model.Lambda[i1, i2, t] + model.Lambda[i2, i1, t] == 1
+    # only the (i, k, t) assignments chosen by the MP need to be sequenced
+    def is_active(self, model, i, k, t):
+        return model.x_param[i, k, t] == 1
 
     def extend_data(self, data):
         x_param_dict = {}
         for i in range(1, self.MP_instance.I + 1):
             for k in range(1, self.MP_instance.K + 1):
                 for t in range(1, self.MP_instance.T + 1):
-                    if(round(self.MP_instance.x[i, k, t].value) == 1):
+                    if((i, k, t) in self.MP_instance.eligible_ikt and round(self.MP_instance.x[i, k, t].value) == 1):
                         x_param_dict[(i, k, t)] = 1
                     else:
                         x_param_dict[(i, k, t)] = 0
         data[None]['x_param'] = x_param_dict
 
-    def fix_SP_variables(self):
-        print("Fixing x variables for phase two...")
-        fixed = 0
-        for k in self.MP_instance.k:
-            for t in self.MP_instance.t:
-                for i in self.MP_instance.i:
-                    self.SP_instance.x[i, k, t].fix(round(self.MP_instance.x[i, k, t].value))
-                    for q in self.SP_instance.q:
-                        self.SP_instance.delta[q, i, k, t].fix(round(self.MP_instance.delta[q, i, k, t].value))
-                    fixed += 1
-        print(str(fixed) + " x variables fixed.")
+    def SP_fixed_values(self, data):
+        fixed_values = {'x': {}, 'delta': {}}
+        for (i, k, t) in self.MP_instance.eligible_ikt:
+            fixed_values['x'][(i, k, t)] = round(self.MP_instance.x[i, k, t].value)
+            for q in self.MP_instance.q:
+                fixed_values['delta'][(q, i, k, t)] = round(self.MP_instance.delta[q, i, k, t].value)
+        return fixed_values
+
+
+# runs in a worker process: builds and solves the SP restricted to a single day
+def solve_SP_day(planner_class, timeLimit, gap, solver, day_data, fixed_values):
+    planner = planner_class(timeLimit, gap, 1, solver)
+    with planner.instrumentation.phase("define_model"):
+        planner.define_SP()
+        planner.define_objective(planner.SP_model)
+    with planner.instrumentation.phase("create_SP_instance") as record:
+        planner.SP_instance = planner.SP_model.create_instance(day_data)
+        record["constraints"] = planner.instrumentation.constraint_counts(planner.SP_instance)
+    building_time = record["wall_time"]
+    with planner.instrumentation.phase("fix_SP_variables"):
+        planner.fix_SP_variables(planner.SP_instance, fixed_values)
+    planner.solve_SP()
+
+    solution = None
+    if planner.has_solution():
+        with planner.instrumentation.phase("extract_solution"):
+            solution = Solution(planner.SP_instance)
+
+    return {"solution": solution,
+            "status": planner.SP_status,
+            "termination_condition": planner.SP_termination_condition,
+            "building_time": building_time,
+            "solver_time": planner.solver_time,
+            "generated_constraints": planner.generated_constraints,
+            "discarded_constraints": planner.discarded_constraints,
+            "phases": planner.instrumentation.phases,
+            "discarded_constraints_by_family": planner.instrumentation.discarded_constraints
+            }
 
 
 class Solution:
@@ -1147,18 +1596,34 @@ class Solution:
             self.extract_solution(model_instance)
 
     def extract_solution(self, model_instance):
-        self.I = model_instance.I
-        self.J = model_instance.J
-        self.K = model_instance.K
-        self.T = model_instance.T
-        self.A = model_instance.A
-        self.Q = model_instance.Q
-
-        # x, beta and delta: discard variables set to 0
-        self.x = {key: value for key, value in model_instance.x.extract_values().items() if round(value) != 0}
-        self.beta = {key: value for key, value in model_instance.beta.extract_values().items() if round(value) != 0}
-        self.gamma = model_instance.gamma.extract_values()
-        self.delta = {key: value for key, value in model_instance.delta.extract_values().items() if round(value) != 0}
+        self.extract_parameters(model_instance)
+
+        # only the variables of the selected patients are read: the cost grows with the scheduled patients, not with the index sets
+        self.x = Solution.selected_indices(model_instance.x, model_instance.x.keys())
+        self.delta = Solution.selected_indices(model_instance.delta, [(q, i, k, t) for (i, k, t) in self.x for q in model_instance.q])
+        self.beta = Solution.selected_indices(model_instance.beta, [(alpha, i, t) for (i, _, t) in self.x for alpha in model_instance.alpha if (alpha, i, t) in model_instance.beta])
+        self.gamma = {i: model_instance.gamma[i].value for (i, _, _) in self.x}
+
+        self.objective_value = pyo.value(model_instance.objective)
+        self.index_patients()
+
+    # those of the given indices whose binary variable is set to 1
+    @staticmethod
+    def selected_indices(variables, indices):
+        selected = {}
+        for index in indices:
+            value = variables[index].value
+            if value is not None and round(value) == 1:
+                selected[index] = 1
+        return selected
+
+    def extract_parameters(self, model_instance):
+        self.I = pyo.value(model_instance.I)
+        self.J = pyo.value(model_instance.J)
+        self.K = pyo.value(model_instance.K)
+        self.T = pyo.value(model_instance.T)
+        self.A = pyo.value(model_instance.A)
+        self.Q = pyo.value(model_instance.Q)
 
         # parameters
         self.d = model_instance.d.extract_values()
@@ -1171,36 +1636,138 @@ class Solution:
         self.tau = model_instance.tau.extract_values()
         self.precedence = model_instance.precedence.extract_values()
 
-        self.objective_value = pyo.value(model_instance.objective)
+    # builds the solution of an SP sequenced outside of the MIP: assignments come from the MP,
+    # start times and anesthetists from the schedule {i: (start, anesthetist)}
+    @staticmethod
+    def from_schedule(MP_instance, schedule):
+        solution = Solution()
+        solution.extract_parameters(MP_instance)
+
+        solution.x = Solution.selected_indices(MP_instance.x, MP_instance.x.keys())
+        solution.delta = Solution.selected_indices(MP_instance.delta, [(q, i, k, t) for (i, k, t) in solution.x for q in MP_instance.q])
+        solution.beta = {(schedule[i][1], i, t): 1 for (i, k, t) in solution.x if schedule[i][1]}
+        solution.gamma = {i: 0 for i in MP_instance.i}
+        solution.gamma.update({i: start for i, (start, _) in schedule.items()})
+
+        solution.objective_value = pyo.value(MP_instance.objective)
+        solution.index_patients()
+        return solution
+
+    # combines the solutions of single-day SPs (each one indexed as day 1), given in day order
+    @staticmethod
+    def merge_days(day_solutions):
+        solution = Solution()
+        first = day_solutions[0]
+        solution.I = first.I
+        solution.J = first.J
+        solution.K = first.K
+        solution.T = len(day_solutions)
+        solution.A = first.A
+        solution.Q = first.Q
+
+        solution.x = {}
+        solution.beta = {}
+        solution.delta = {}
+        solution.gamma = dict(first.gamma)
+        solution.s = {}
+        solution.tau = {}
+        for t, day_solution in enumerate(day_solutions, start=1):
+            solution.x.update({(i, k, t): value for (i, k, _), value in day_solution.x.items()})
+            solution.beta.update({(alpha, i, t): value for (alpha, i, _), value in day_solution.beta.items()})
+            solution.delta.update({(q, i, k, t): value for (q, i, k, _), value in day_solution.delta.items()})
+            solution.gamma.update({i: day_solution.gamma[i] for (i, _, _) in day_solution.x})
+            solution.s.update({(k, t): value for (k, _), value in day_solution.s.items()})
+            solution.tau.update({(j, k, t): value for (j, k, _), value in day_solution.tau.items()})
+
+        solution.d = first.d
+        solution.c = first.c
+        solution.a = first.a
+        solution.specialty = first.specialty
+        solution.r = first.r
+        solution.p = first.p
+        solution.precedence = first.precedence
+
+        solution.objective_value = sum(day_solution.objective_value for day_solution in day_solutions)
+        solution.index_patients()
+        return solution
+
+    # per-patient arrays (patient i at position i - 1) and slot arrays ((k, t) at [k - 1, t - 1]), built in one pass
+    # over the selected variables: room and day are 0 for patients left out, anesthetist is 0 if not needed
+    def index_patients(self):
+        patients = range(1, self.I + 1)
+        self.operating_times = np.array([self.p[i] for i in patients], dtype=float)
+        self.priorities = np.array([self.r[i] for i in patients], dtype=float)
+        self.specialties = np.array([self.specialty[i] for i in patients], dtype=int)
+
+        self.room = np.zeros(self.I, dtype=int)
+        self.day = np.zeros(self.I, dtype=int)
+        for (i, k, t) in self.x:
+            self.room[i - 1] = k
+            self.day[i - 1] = t
+        self.scheduled = self.room > 0
+        self.delay = np.zeros(self.I)
+        for (q, i, _, _) in self.delta:
+            self.delay[i - 1] += self.d[(q, i)]
+        self.anesthetist = np.zeros(self.I, dtype=int)
+        for (alpha, i, _) in self.beta:
+            self.anesthetist[i - 1] = alpha
+        self.start = np.array([self.gamma.get(i) or 0 for i in patients], dtype=float)
+
+        self.room_capacity = np.array([[self.s[(k, t)] for t in range(1, self.T + 1)] for k in range(1, self.K + 1)], dtype=float)
+        self.room_specialty = np.array([[[self.tau[(j, k, t)] for t in range(1, self.T + 1)] for k in range(1, self.K + 1)] for j in range(1, self.J + 1)], dtype=int)
+
+    # occupied time over slot time of each (k, t), and which slots have at least one patient
+    def slot_utilization(self):
+        rooms = self.room[self.scheduled] - 1
+        days = self.day[self.scheduled] - 1
+        load = np.zeros((self.K, self.T))
+        np.add.at(load, (rooms, days), self.operating_times[self.scheduled] + self.delay[self.scheduled])
+        used = np.zeros((self.K, self.T), dtype=bool)
+        used[rooms, days] = True
+        return load / self.room_capacity, used
+
+    def operating_room_utilization(self):
+        utilization, used = self.slot_utilization()
+        return {(k + 1, t + 1): utilization[k, t].item() for k, t in zip(*np.nonzero(used))}
+
+    # average utilization of the used slots assigned to each specialty
+    def operating_room_utilization_by_specialty(self):
+        utilization, used = self.slot_utilization()
+        utilization_by_specialty = {}
+        for j in range(1, self.J + 1):
+            slots = used & (self.room_specialty[j - 1] == 1)
+            utilization_by_specialty[j] = utilization[slots].mean().item() if slots.any() else 0
+        return utilization_by_specialty
+
+    def specialty_selection_ratio(self):
+        selected = np.bincount(self.specialties[self.scheduled], minlength=self.J + 1)
+        total = np.bincount(self.specialties, minlength=self.J + 1)
+        return {j: (selected[j] / total[j]).item() if total[j] else 0 for j in range(1, self.J + 1)}
+
+    # the two terms of the objective function: normalised priority of the scheduled patients, and their delay time
+    def objective_split(self):
+        return {"priority": (self.priorities[self.scheduled].sum() / self.priorities.sum()).item(),
+                "delay": self.delay[self.scheduled].sum().item()}
 
     def to_patients_dict(self):
         patients_dict = {(k, t): [] for k in range(1, self.K + 1) for t in range(1, self.T + 1)}
-        for (i, k, t) in self.x:
-            delay = False
-            arrival_delay = 0
-            for q in range(1, self.Q + 1):
-                if (q, i, k, t) in self.delta:
-                    delay = True
-                    arrival_delay = self.d[(q, i)]
-                    break
-            anesthetist = 0
-            for alpha in range(1, self.A + 1):
-                if (alpha, i, t) in self.beta:
-                    anesthetist = alpha
-                    break
+        for index in np.flatnonzero(self.scheduled):
+            i = index.item() + 1
+            k = self.room[index].item()
+            t = self.day[index].item()
             patients_dict[(k, t)].append(Patient(id=i, 
                                                  priority=self.r[i],
                                                  room=k,
                                                  specialty=self.specialty[i],
                                                  day=t,
                                                  operatingTime=self.p[i],
-                                                 arrival_delay=arrival_delay,
+                                                 arrival_delay=self.delay[index].item(),
                                                  covid=self.c[i], 
                                                  precedence=self.precedence[i], 
                                                  delayWeight=None, 
                                                  anesthesia=self.a[i], 
-                                                 anesthetist=anesthetist, 
-                                                 order=round(self.gamma[i], 2),
-                                                 delay=delay)
+                                                 anesthetist=self.anesthetist[index].item(), 
+                                                 order=round(self.start[index].item(), 2),
+                                                 delay=self.delay[index].item() > 0)
                                         )
         return patients_dict
@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+from planner.planners import SimplePlanner, HeuristicLBBDPlanner, VanillaLBBDPlanner
+from planner.greedy_planner import Planner as GreedyPlanner
+
+
+# each planner gets a share of the deadline as its own time limit, the rest is left to write and collect its schedule
+def default_portfolio(deadline, solver, gap=1e-06, iterations_cap=30, time_share=0.8):
+    time_limit = deadline * time_share
+    return {"greedy": (GreedyPlanner, {"packingStrategy": "best fit", "anesthetistAssignmentStrategy": "WIS"}),
+            "simple": (SimplePlanner, {"timeLimit": time_limit, "gap": gap, "solver": solver}),
+            "heuristic_LBBD": (HeuristicLBBDPlanner, {"timeLimit": time_limit, "gap": gap, "iterations_cap": iterations_cap, "solver": solver}),
+            "vanilla_LBBD": (VanillaLBBDPlanner, {"timeLimit": time_limit, "gap": gap, "iterations_cap": iterations_cap, "solver": solver})}
+
+
+# value of the objective of the MIP models; greedy planners compute it themselves, whichever module path they come from
+def objective_value(planner):
+    if hasattr(planner, "compute_MIP_objective_value"):
+        return planner.compute_MIP_objective_value()
+    return planner.solution.objective_value
+
+
+# runs in its own process group, so that the solver processes it starts are killed along with it;
+# messages are (name, objective value, schedule, whether the planner is done)
+def run_member(name, planner_class, options, data, channel):
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    try:
+        planner = planner_class(**options)
+        # incumbents are sent as they are found: a planner killed at the deadline still contributes its best one
+        if hasattr(planner, "set_progress_callback"):
+            planner.set_progress_callback(lambda progress: send_incumbent(name, progress, channel))
+        planner.solve_model(data)
+        channel.put((name, objective_value(planner), planner.extract_solution(), True))
+    except Exception as exception:
+        channel.put((name, None, repr(exception), True))
+
+
+def send_incumbent(name, progress, channel):
+    if progress["event"] == "incumbent":
+        channel.put((name, progress["objective_value"], progress["solution"].to_patients_dict(), False))
+
+
+class PortfolioPlanner:
+    """Races several planners in parallel processes on the same instance, and keeps the best schedule found
+    by the deadline, intermediate incumbents included. Planners still running at the deadline are killed.
+
+    planners maps a name to a (planner class, constructor options) pair, see default_portfolio.
+    """
+
+    def __init__(self, deadline, planners):
+        self.deadline = deadline
+        self.planners = planners
+        self.solution = None
+        self.best_planner = None
+
+    def solve_model(self, data):
+        start_time = time.perf_counter()
+        self.solution = None
+        self.best_planner = None
+        self.best_objective_value = None
+        self.objective_values = {}
+        self.errors = {}
+        self.finish_times = {}
+
+        channel = multiprocessing.Queue()
+        processes = {name: multiprocessing.Process(target=run_member, args=(name, planner_class, options, data, channel))
+                     for name, (planner_class, options) in self.planners.items()}
+        for process in processes.values():
+            process.start()
+
+        while len(self.finish_times) < len(processes):
+            remaining_time = self.deadline - (time.perf_counter() - start_time)
+            if remaining_time <= 0:
+                break
+            try:
+                name, value, schedule, done = channel.get(timeout=remaining_time)
+            except queue.Empty:
+                break
+            if done:
+                self.finish_times[name] = time.perf_counter() - start_time
+            if value is None:
+                self.errors[name] = schedule
+                continue
+            self.objective_values[name] = max(value, self.objective_values.get(name, value))
+            if self.best_objective_value is None or value > self.best_objective_value:
+                self.best_objective_value = value
+                self.solution = schedule
+                self.best_planner = name
+
+        self.killed = [name for name in processes if name not in self.finish_times]
+        for name, process in processes.items():
+            if name in self.killed:
+                self.kill(process)
+            process.join()
+        self.run_time = time.perf_counter() - start_time
+
+    def kill(self, process):
+        if hasattr(os, "killpg"):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        # the process may not have made its own group yet
+        process.kill()
+
+    def extract_solution(self):
+        return self.solution
+
+    def extract_run_info(self):
+        return {"objective_function_value": self.best_objective_value,
+                "best_planner": self.best_planner,
+                "objective_values": self.objective_values,
+                "finish_times": self.finish_times,
+                "killed": self.killed,
+                "errors": self.errors,
+                "run_time": self.run_time}
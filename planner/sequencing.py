@@ -0,0 +1,136 @@
+FEASIBLE = "feasible"
+INFEASIBLE = "infeasible"
+BUDGET_EXHAUSTED = "budget exhausted"
+
+
+class SearchBudgetExhausted(Exception):
+    pass
+
+
+class DaySequencer:
+    """Sequences the patients already assigned to the rooms of a single day.
+
+    Patients are appended one at a time to the timeline of their room, starting as soon as both the room
+    and (for anesthesia patients) the chosen anesthetist are free. Any feasible schedule can be left-shifted
+    into one built this way, so an exhausted search proves infeasibility. Within a room, precedence classes
+    are sequenced in non-decreasing order, and patients without anesthesia of the same class and duration
+    are interchangeable, hence only one of them is branched on.
+    """
+
+    def __init__(self, room_capacity, anesthetist_availability, node_budget=20000):
+        self.room_capacity = room_capacity
+        self.anesthetist_availability = anesthetist_availability
+        self.node_budget = node_budget
+
+    # patients: list of (id, room, duration, precedence, anesthesia)
+    # returns the search status and, when feasible, {id: (start, anesthetist)} (anesthetist 0 if not needed)
+    def sequence(self, patients):
+        self.duration = {i: duration for (i, _, duration, _, _) in patients}
+
+        blocks = {}
+        for (i, k, _, precedence, anesthesia) in patients:
+            blocks.setdefault(k, {}).setdefault(precedence, ([], []))[1 if anesthesia else 0].append(i)
+        # for each room, (non-anesthesia, anesthesia) patients of each precedence class, in precedence order
+        self.blocks = {k: [blocks[k][precedence] for precedence in sorted(blocks[k])] for k in blocks}
+        for room_blocks in self.blocks.values():
+            for (non_anesthesia, _) in room_blocks:
+                non_anesthesia.sort(key=lambda i: self.duration[i], reverse=True)
+
+        self.room_end = {k: 0 for k in self.room_capacity}
+        self.room_load = {k: 0 for k in self.room_capacity}
+        for (i, k, duration, _, _) in patients:
+            self.room_load[k] += duration
+        self.anesthetist_end = {alpha: 0 for alpha in self.anesthetist_availability}
+        self.anesthetist_used = {alpha: 0 for alpha in self.anesthetist_availability}
+        self.anesthesia_load = sum(duration for (_, _, duration, _, anesthesia) in patients if anesthesia)
+
+        self.placed = set()
+        self.schedule = {}
+        self.remaining = len(patients)
+        self.nodes = 0
+
+        try:
+            if self.search():
+                return FEASIBLE, {i: (start, alpha) for i, (start, alpha, _, _) in self.schedule.items()}
+            return INFEASIBLE, None
+        except SearchBudgetExhausted:
+            return BUDGET_EXHAUSTED, None
+
+    def search(self):
+        if self.remaining == 0:
+            return True
+        self.nodes += 1
+        if self.nodes > self.node_budget:
+            raise SearchBudgetExhausted()
+        if not self.bounds_hold():
+            return False
+
+        for (start, k, i, alpha) in self.candidates():
+            self.place(start, k, i, alpha)
+            if self.search():
+                return True
+            self.unplace(start, k, i, alpha)
+        return False
+
+    def bounds_hold(self):
+        for k, load in self.room_load.items():
+            if self.room_end[k] + load > self.room_capacity[k]:
+                return False
+        residual_anesthesia_time = sum(self.anesthetist_availability[alpha] - self.anesthetist_used[alpha] for alpha in self.anesthetist_availability)
+        return self.anesthesia_load <= residual_anesthesia_time
+
+    def current_block(self, k):
+        for (non_anesthesia, anesthesia) in self.blocks.get(k, []):
+            pending_non_anesthesia = [i for i in non_anesthesia if i not in self.placed]
+            pending_anesthesia = [i for i in anesthesia if i not in self.placed]
+            if pending_non_anesthesia or pending_anesthesia:
+                return pending_non_anesthesia, pending_anesthesia
+        return [], []
+
+    # next placements, earliest start first
+    def candidates(self):
+        candidates = []
+        for k in self.blocks:
+            non_anesthesia, anesthesia = self.current_block(k)
+            # one branch per distinct duration: patients of different durations are not interchangeable
+            durations = set()
+            for i in non_anesthesia:
+                if self.duration[i] not in durations:
+                    durations.add(self.duration[i])
+                    candidates.append((self.room_end[k], k, i, 0))
+            for i in anesthesia:
+                seen_anesthetists = set()
+                for alpha in self.anesthetist_availability:
+                    # anesthetists in the same state are interchangeable
+                    state = (self.anesthetist_end[alpha], self.anesthetist_used[alpha], self.anesthetist_availability[alpha])
+                    if state in seen_anesthetists or self.anesthetist_used[alpha] + self.duration[i] > self.anesthetist_availability[alpha]:
+                        continue
+                    seen_anesthetists.add(state)
+                    start = max(self.room_end[k], self.anesthetist_end[alpha])
+                    if start + self.room_load[k] <= self.room_capacity[k]:
+                        candidates.append((start, k, i, alpha))
+        candidates.sort()
+        return candidates
+
+    def place(self, start, k, i, alpha):
+        end = start + self.duration[i]
+        self.schedule[i] = (start, alpha, self.room_end[k], self.anesthetist_end.get(alpha))
+        self.placed.add(i)
+        self.remaining -= 1
+        self.room_end[k] = end
+        self.room_load[k] -= self.duration[i]
+        if alpha:
+            self.anesthetist_end[alpha] = end
+            self.anesthetist_used[alpha] += self.duration[i]
+            self.anesthesia_load -= self.duration[i]
+
+    def unplace(self, start, k, i, alpha):
+        (_, _, previous_room_end, previous_anesthetist_end) = self.schedule.pop(i)
+        self.placed.remove(i)
+        self.remaining += 1
+        self.room_end[k] = previous_room_end
+        self.room_load[k] += self.duration[i]
+        if alpha:
+            self.anesthetist_end[alpha] = previous_anesthetist_end
+            self.anesthetist_used[alpha] -= self.duration[i]
+            self.anesthesia_load += self.duration[i]
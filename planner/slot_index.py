@@ -0,0 +1,86 @@
+from bisect import bisect_left, bisect_right, insort
+from math import inf
+
+
+class FirstFitIndex:
+    """Residual capacities of an ordered sequence of slots, in a max segment tree:
+    the first slot whose residual fits a duration is found in O(log S)."""
+
+    def __init__(self, slots, residuals):
+        self.slots = slots
+        self.positions = {slot: position for position, slot in enumerate(slots)}
+        self.size = 1
+        while self.size < len(slots):
+            self.size *= 2
+        self.tree = [-inf] * (2 * self.size)
+        for position, residual in enumerate(residuals):
+            self.tree[self.size + position] = residual
+        for node in range(self.size - 1, 0, -1):
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+
+    def first_fit(self, duration):
+        if self.tree[1] < duration:
+            return None
+        node = 1
+        while node < self.size:
+            # go left whenever the left subtree has room: it holds the earlier slots
+            node = 2 * node if self.tree[2 * node] >= duration else 2 * node + 1
+        return self.slots[node - self.size]
+
+    def reduce(self, slot, duration):
+        node = self.size + self.positions[slot]
+        self.tree[node] -= duration
+        node //= 2
+        while node:
+            self.tree[node] = max(self.tree[2 * node], self.tree[2 * node + 1])
+            node //= 2
+
+
+class BestFitIndex:
+    """Residual capacities of an ordered sequence of slots, kept sorted: the tightest slot whose residual fits
+    a duration is found by bisection (among equally tight slots, the earliest one)."""
+
+    def __init__(self, slots, residuals):
+        self.slots = slots
+        self.positions = {slot: position for position, slot in enumerate(slots)}
+        self.residuals = dict(zip(slots, residuals))
+        self.entries = sorted((residual, position) for position, residual in enumerate(residuals))
+
+    def best_fit(self, duration):
+        index = bisect_left(self.entries, (duration, -1))
+        if index == len(self.entries):
+            return None
+        return self.slots[self.entries[index][1]]
+
+    def reduce(self, slot, duration):
+        position = self.positions[slot]
+        self.entries.pop(bisect_left(self.entries, (self.residuals[slot], position)))
+        self.residuals[slot] -= duration
+        insort(self.entries, (self.residuals[slot], position))
+
+
+class GapIndex:
+    """Unscheduled patients by (specialty, precedence), each class sorted by operating time:
+    the longest patient fitting a gap is found by bisection."""
+
+    def __init__(self, patients):
+        self.patients = {patient.id: patient for patient in patients}
+        self.buckets = {}
+        for patient in patients:
+            self.buckets.setdefault((patient.specialty, patient.precedence), []).append((patient.operatingTime, patient.priority, patient.id))
+        for bucket in self.buckets.values():
+            bucket.sort()
+
+    def precedences(self, specialty, lowest, highest):
+        return sorted(precedence for (j, precedence), bucket in self.buckets.items() if j == specialty and bucket and lowest <= precedence <= highest)
+
+    # removes and returns the longest patient within the residual time (the highest priority one among equally long ones)
+    def pop_longest_fitting(self, specialty, precedence, residual):
+        bucket = self.buckets.get((specialty, precedence))
+        if not bucket:
+            return None
+        index = bisect_right(bucket, (residual, inf, inf)) - 1
+        if index < 0:
+            return None
+        (_, _, id) = bucket.pop(index)
+        return self.patients.pop(id)
@@ -1,5 +1,6 @@
 import unittest
-from data_maker import DataDescriptor, DataMaker
+from data_maker import DataDescriptor
+from instance_cache import instance_cache
 
 
 def build_data_dictionary():
@@ -10,8 +11,7 @@ def build_data_dictionary():
                                     anesthesia_frequency = 0.5,
                                     robustness_parameter=2)
 
-    dataMaker = DataMaker(seed=52876, data_descriptor=data_descriptor)
-    return dataMaker.create_data_dictionary()
+    return instance_cache.get(52876, data_descriptor)
 
 
 class TestCommon(unittest.TestCase):
@@ -1,6 +1,8 @@
 import unittest
 
-from planners import SimplePlanner
+from planners import SimplePlanner, LNSPlanner, ReplanningPlanner
+from patient_delta import PatientDelta
+from greedy_planner import Planner as GreedyPlanner
 from test.common import build_data_dictionary
 from test.common import TestCommon
 
@@ -41,5 +43,246 @@ class TestSimplePlanner(TestCommon):
         self.anesthetist_assignment()
 
 
+class TestSimplePlannerWarmStart(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = SimplePlanner(timeLimit=60, gap=0.01, solver="cplex")
+        planner.solve_model(self.dataDictionary, warm_start=True)
+        self.solution = planner.extract_solution()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+
+
+class TestSimplePlannerReusedModel(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = SimplePlanner(timeLimit=60, gap=0.01, solver="cplex", reuse_model=True)
+        planner.solve_model(self.dataDictionary)
+        # same structure, different priorities: the instance is updated instead of rebuilt
+        self.dataDictionary[None]["r"] = {i: 130 - r for i, r in self.dataDictionary[None]["r"].items()}
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+
+class TestLNSPlanner(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = LNSPlanner(timeLimit=60, gap=0.01, solver="cplex", neighbourhood_time_limit=10, seed=52876)
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+        self.run_info = planner.extract_run_info()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    # only improvements are accepted
+    def test_no_worse_than_first_solve(self):
+        self.assertGreaterEqual(self.run_info["objective_function_value"], self.run_info["initial_objective_function_value"] - 1e-6)
+
+
+# the first solve of the whole model loads nothing, as when its time limit is too short
+class FirstSolveFailingLNSPlanner(LNSPlanner):
+
+    def solve_instance(self, time_limit, warm_start):
+        if self.iterations == 0:
+            return False
+        return super().solve_instance(time_limit, warm_start)
+
+
+class TestLNSPlannerWithoutFirstSolution(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = FirstSolveFailingLNSPlanner(timeLimit=60, gap=0.01, solver="cplex", neighbourhood_time_limit=10, iterations_cap=3, seed=52876)
+        planner.solve_model(self.dataDictionary, warm_start=False)
+        self.solution = planner.extract_solution()
+        self.run_info = planner.extract_run_info()
+
+        greedy_planner = GreedyPlanner(packingStrategy="best fit", anesthetistAssignmentStrategy="WIS")
+        greedy_planner.solve_model(build_data_dictionary())
+        self.greedy_objective_value = greedy_planner.compute_MIP_objective_value()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    def test_greedy_incumbent(self):
+        self.assertAlmostEqual(self.run_info["initial_objective_function_value"], self.greedy_objective_value)
+        self.assertGreaterEqual(self.run_info["objective_function_value"], self.greedy_objective_value - 1e-6)
+
+
+class TestReplanningPlanner(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        previousData = build_data_dictionary()
+        planner = SimplePlanner(timeLimit=60, gap=0.01, solver="cplex")
+        planner.solve_model(previousData)
+        previous_solution = planner.solution
+        previous_plan = planner.extract_solution()
+
+        # two cancellations and a longer operation on days 2 to 5, one new referral; day 1 is frozen
+        scheduled = sorted((i, t) for (i, k, t) in previous_solution.x)
+        late = [i for (i, t) in scheduled if t > 1]
+        delta = PatientDelta(added=[{'p': 60, 'r': 100, 'a': 0, 'c': 0, 'specialty': 1, 'precedence': 1, 'd': {1: 0}}],
+                             removed=late[:2],
+                             durations={late[2]: previousData[None]['p'][late[2]] + 20})
+
+        replanner = ReplanningPlanner(timeLimit=60, gap=0.01, solver="cplex")
+        self.dataDictionary = replanner.replan(previous_solution, previousData, delta, frozen_days={1})
+        self.solution = replanner.extract_solution()
+        self.run_info = replanner.extract_run_info()
+
+        _, new_index = delta.apply(previousData)
+        self.previous_day_1 = {(new_index[p.id], k, p.order, p.anesthetist) for k in range(1, previousData[None]["K"][None] + 1) for p in previous_plan[(k, 1)]}
+
+        # operating times of a frozen day cannot change
+        early = [i for (i, t) in scheduled if t == 1]
+        self.frozen_change_rejected = False
+        if early:
+            try:
+                replanner.replan(previous_solution, previousData, PatientDelta(durations={early[0]: 10}), frozen_days={1})
+            except ValueError:
+                self.frozen_change_rejected = True
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    def test_frozen_day_kept(self):
+        day_1 = {(p.id, k, p.order, p.anesthetist) for k in range(1, self.dataDictionary[None]["K"][None] + 1) for p in self.solution[(k, 1)]}
+        self.assertEqual(day_1, self.previous_day_1)
+
+    def test_frozen_day_change_rejected(self):
+        self.assertTrue(self.frozen_change_rejected)
+
+    def test_only_affected_slots_freed(self):
+        self.assertTrue(self.run_info["affected_slots"])
+        self.assertTrue(all(t > 1 for (k, t) in self.run_info["affected_slots"]))
+
 if __name__ == '__main__':
     unittest.main()
@@ -42,5 +42,157 @@ class TestVanillaLBBDPlanner(TestCommon):
         self.anesthetist_assignment()
 
 
+class TestVanillaLBBDPlannerSequencing(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = VanillaLBBDPlanner(timeLimit=60, gap=0.01, iterations_cap=30, solver="cplex", sequencing=True)
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+
+class TestVanillaLBBDPlannerDayCuts(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = VanillaLBBDPlanner(timeLimit=60, gap=0.01, iterations_cap=30, solver="cplex", day_cuts=True)
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+
+class TestVanillaLBBDPlannerProgress(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        self.progress = []
+        planner = VanillaLBBDPlanner(timeLimit=60, gap=0.01, iterations_cap=30, solver="cplex")
+        planner.set_progress_callback(self.progress.append)
+        planner.solve_model(self.dataDictionary)
+        self.run_info = planner.extract_run_info()
+
+        # a second run is stopped by its callback at the first incumbent
+        self.stopped_progress = []
+        planner.set_progress_callback(lambda progress: self.stopped_progress.append(progress) or progress["event"] != "incumbent")
+        planner.solve_model(self.dataDictionary)
+
+    def test_incumbents_improve(self):
+        incumbents = [progress["objective_value"] for progress in self.progress if progress["event"] == "incumbent"]
+        self.assertTrue(incumbents)
+        self.assertEqual(incumbents, sorted(incumbents))
+        self.assertAlmostEqual(incumbents[-1], self.run_info["objective_function_value"])
+
+    def test_bounds_decrease(self):
+        bounds = [progress["upper_bound"] for progress in self.progress if progress["event"] == "bound"]
+        self.assertTrue(bounds)
+        self.assertEqual(bounds, sorted(bounds, reverse=True))
+
+    def test_stop_requested(self):
+        incumbents = [progress for progress in self.stopped_progress if progress["event"] == "incumbent"]
+        self.assertEqual(len(incumbents), 1)
+        self.assertEqual(self.stopped_progress[-1]["iteration"], incumbents[0]["iteration"])
+
+
+class TestVanillaLBBDPlannerReusedModel(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+
+        self.dataDictionary = build_data_dictionary()
+
+        planner = VanillaLBBDPlanner(timeLimit=60, gap=0.01, iterations_cap=30, solver="cplex", reuse_model=True)
+        planner.solve_model(self.dataDictionary)
+        self.first_time_limits = [record["time_limit"] for record in planner.instrumentation.phases if record["phase"] == "solve_MP"]
+        # same structure, different priorities: the MP instance is updated instead of rebuilt
+        self.dataDictionary[None]["r"] = {i: 130 - r for i, r in self.dataDictionary[None]["r"].items()}
+        planner.solve_model(self.dataDictionary)
+        self.second_time_limits = [record["time_limit"] for record in planner.instrumentation.phases if record["phase"] == "solve_MP"]
+        self.solution = planner.extract_solution()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    # the budget used up by the first run is not carried over to the second one
+    def test_full_time_limit_on_second_solve(self):
+        self.assertEqual(self.first_time_limits[0], 60)
+        self.assertEqual(self.second_time_limits[0], 60)
+
 if __name__ == '__main__':
     unittest.main()
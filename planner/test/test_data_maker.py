@@ -0,0 +1,20 @@
+import unittest
+
+from data_maker import DataDescriptor, make_data_dictionaries
+
+
+class TestDataMaker(unittest.TestCase):
+
+    def test_reproducible_whatever_the_workers(self):
+        data_descriptors = [DataDescriptor(patients=60, robustness_parameter=robustness) for robustness in [0, 2, 3, 5]]
+
+        sequential = make_data_dictionaries(52876, data_descriptors, workers=1)
+        parallel = make_data_dictionaries(52876, data_descriptors, workers=4)
+
+        self.assertEqual(sequential, parallel)
+        # children of the same seed are independent streams
+        self.assertNotEqual(sequential[0][None]['p'], sequential[1][None]['p'])
+
+
+if __name__ == '__main__':
+    unittest.main()
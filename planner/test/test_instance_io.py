@@ -0,0 +1,41 @@
+import tempfile
+import unittest
+
+import numpy as np
+
+from data_maker import DataDescriptor, DataMaker
+from instance_cache import InstanceCache
+from instance_io import save_instance, load_instance
+from test.common import build_data_dictionary
+
+
+class TestInstanceIO(unittest.TestCase):
+
+    def test_round_trip(self):
+        data = build_data_dictionary()
+        with tempfile.TemporaryDirectory() as path:
+            save_instance(path, data)
+            loaded = load_instance(path)
+
+        for name, values in data[None].items():
+            self.assertEqual(loaded[None][name], values)
+
+    # a disk-backed cache holds memory-mapped arrays, and builds a new data dictionary for each caller
+    def test_cache_maps_instances(self):
+        data_descriptor = DataDescriptor(patients=20, days=2, anesthetists=1)
+        expected = DataMaker(seed=7, data_descriptor=data_descriptor).create_data_dictionary()
+        with tempfile.TemporaryDirectory() as path:
+            cache = InstanceCache(path)
+            first = cache.get(7, data_descriptor)
+            second = InstanceCache(path).get(7, data_descriptor)
+            _, arrays = cache.get_arrays(7, data_descriptor)
+            self.assertIsInstance(arrays['p'], np.memmap)
+            # a caller changing its dictionary does not change the cached instance
+            first[None]['p'][1] += 1
+            self.assertEqual(cache.get(7, data_descriptor)[None]['p'], expected[None]['p'])
+
+        self.assertEqual(second, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
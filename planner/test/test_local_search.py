@@ -0,0 +1,49 @@
+import unittest
+
+from local_search import LocalSearchPlanner
+from test.common import build_data_dictionary
+from test.common import TestCommon
+
+
+class TestLocalSearch(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+        self.dataDictionary = build_data_dictionary()
+        planner = LocalSearchPlanner(timeLimit=5, seed=52876)
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+        self.objective_value = planner.compute_objective_value()
+        self.initial_objective_value = planner.initial_objective_value
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    # the greedy schedule is the starting point, and the best schedule met is the one returned
+    def test_no_worse_than_greedy(self):
+        self.assertGreaterEqual(self.objective_value, self.initial_objective_value)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from planner.greedy_planner import Planner
+from planner.local_search import LocalSearchPlanner
+from planner.portfolio import PortfolioPlanner
+from test.common import build_data_dictionary
+from test.common import TestCommon
+
+
+class TestPortfolio(TestCommon):
+
+    @classmethod
+    def setUpClass(self):
+        self.dataDictionary = build_data_dictionary()
+        planner = PortfolioPlanner(deadline=20, planners={"first fit": (Planner, {"packingStrategy": "first fit", "anesthetistAssignmentStrategy": "WIS"}),
+                                                          "best fit": (Planner, {"packingStrategy": "best fit", "anesthetistAssignmentStrategy": "WIS"}),
+                                                          "local search": (LocalSearchPlanner, {"timeLimit": 5, "seed": 52876}),
+                                                          "too slow": (LocalSearchPlanner, {"timeLimit": 60, "seed": 52876})})
+        planner.solve_model(self.dataDictionary)
+        self.solution = planner.extract_solution()
+        self.run_info = planner.extract_run_info()
+
+    def test_non_empty_solution(self):
+        self.non_empty_solution()
+
+    def test_non_overlapping_patients(self):
+        self.non_overlapping_patients()
+
+    def test_non_overlapping_anesthetists(self):
+        self.non_overlapping_anesthetists()
+
+    def test_surgery_time_constraint(self):
+        self.surgery_time_constraint()
+
+    def test_end_of_day_constraint(self):
+        self.end_of_day_constraint()
+
+    def test_anesthesia_total_time_constraint(self):
+        self.anesthesia_total_time_constraint()
+
+    def test_single_surgery(self):
+        self.single_surgery()
+
+    def test_anesthetist_assignment(self):
+        self.anesthetist_assignment()
+
+    def test_no_member_failed(self):
+        self.assertEqual(self.run_info["errors"], {})
+
+    def test_best_planner(self):
+        self.assertEqual(self.run_info["objective_function_value"], max(self.run_info["objective_values"].values()))
+        self.assertEqual(self.run_info["objective_function_value"], self.run_info["objective_values"][self.run_info["best_planner"]])
+
+    def test_stragglers_killed(self):
+        self.assertEqual(self.run_info["killed"], ["too slow"])
+        self.assertLess(self.run_info["run_time"], 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
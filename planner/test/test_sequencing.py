@@ -0,0 +1,61 @@
+import unittest
+
+from sequencing import DaySequencer, FEASIBLE, INFEASIBLE, BUDGET_EXHAUSTED
+
+
+class TestDaySequencer(unittest.TestCase):
+
+    def setUp(self):
+        self.room_capacity = {1: 120, 2: 100}
+        self.anesthetist_availability = {1: 100}
+
+    def test_feasible_schedule(self):
+        patients = [(1, 1, 40, 3, True),
+                    (2, 1, 30, 1, False),
+                    (3, 2, 50, 1, True),
+                    (4, 2, 20, 5, False),
+                    (5, 1, 20, 5, False)]
+        status, schedule = DaySequencer(self.room_capacity, self.anesthetist_availability).sequence(patients)
+        self.assertEqual(status, FEASIBLE)
+
+        end = {i: schedule[i][0] + duration for (i, _, duration, _, _) in patients}
+        for (i1, k1, _, precedence1, anesthesia1) in patients:
+            self.assertTrue(end[i1] <= self.room_capacity[k1])
+            self.assertEqual(schedule[i1][1] != 0, anesthesia1)
+            for (i2, k2, _, precedence2, _) in patients:
+                if i1 == i2:
+                    continue
+                if k1 == k2 and precedence1 < precedence2:
+                    self.assertTrue(schedule[i1][0] <= schedule[i2][0])
+                if k1 == k2 or (schedule[i1][1] and schedule[i1][1] == schedule[i2][1]):
+                    self.assertTrue(end[i1] <= schedule[i2][0] or end[i2] <= schedule[i1][0])
+
+    # both rooms need the single anesthetist for their whole day
+    def test_infeasible_anesthetist_overlap(self):
+        patients = [(1, 1, 60, 1, True),
+                    (2, 2, 60, 1, True)]
+        status, schedule = DaySequencer({1: 100, 2: 100}, {1: 200}).sequence(patients)
+        self.assertEqual(status, INFEASIBLE)
+        self.assertIsNone(schedule)
+
+    # only A 0-10, X 10-65, B 65-115 | Y 0-10, W 10-65, Z 65-100 works: the two non-anesthesia patients of
+    # room 1 must not be collapsed into one branch
+    def test_feasible_with_different_durations(self):
+        patients = [(1, 1, 10, 1, False),
+                    (2, 1, 50, 1, False),
+                    (3, 1, 55, 1, True),
+                    (4, 2, 10, 1, True),
+                    (5, 2, 55, 3, False),
+                    (6, 2, 35, 5, True)]
+        status, schedule = DaySequencer({1: 115, 2: 100}, {1: 270}).sequence(patients)
+        self.assertEqual(status, FEASIBLE)
+        self.assertEqual(schedule[3], (10, 1))
+
+    def test_budget_exhausted(self):
+        patients = [(i, 1 + i % 2, 10 + i, 1, True) for i in range(1, 9)]
+        status, _ = DaySequencer(self.room_capacity, {1: 100, 2: 100}, node_budget=1).sequence(patients)
+        self.assertEqual(status, BUDGET_EXHAUSTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
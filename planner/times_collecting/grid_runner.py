@@ -0,0 +1,154 @@
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from planner import SimplePlanner, LNSPlanner, HeuristicLBBDPlanner, VanillaLBBDPlanner
+from planner.data_maker import DataDescriptor
+from planner.instance_cache import InstanceCache
+from planner.greedy_planner import Planner as GreedyPlanner
+from planner.local_search import LocalSearchPlanner
+
+
+def create_planner(configuration):
+    if configuration["planner"] == "simple":
+        return SimplePlanner(configuration["time_limit"], configuration["gap"], configuration["solver"])
+    if configuration["planner"] == "LNS":
+        return LNSPlanner(timeLimit=configuration["time_limit"], gap=configuration["gap"], solver=configuration["solver"], seed=configuration["seed"])
+    if configuration["planner"] == "heuristic_LBBD":
+        return HeuristicLBBDPlanner(timeLimit=configuration["time_limit"], gap=configuration["gap"], iterations_cap=configuration["iterations_cap"], solver=configuration["solver"])
+    if configuration["planner"] == "vanilla_LBBD":
+        return VanillaLBBDPlanner(timeLimit=configuration["time_limit"], gap=configuration["gap"], iterations_cap=configuration["iterations_cap"], solver=configuration["solver"])
+    if configuration["planner"] == "greedy":
+        return GreedyPlanner(packingStrategy=configuration["packing_strategy"], anesthetistAssignmentStrategy=configuration["anesthetist_assignment_strategy"])
+    if configuration["planner"] == "local_search":
+        return LocalSearchPlanner(timeLimit=configuration["time_limit"], seed=configuration["seed"],
+                                  packingStrategy=configuration["packing_strategy"], anesthetistAssignmentStrategy=configuration["anesthetist_assignment_strategy"])
+    raise ValueError("Unknown planner " + configuration["planner"])
+
+
+def extract_run_info(planner):
+    # the greedy planner has no solver, hence no run info beyond its objective value
+    if isinstance(planner, GreedyPlanner) and not isinstance(planner, LocalSearchPlanner):
+        return {"objective_function_value": planner.compute_objective_value()}
+    return planner.extract_run_info()
+
+
+# instances are made once for all the configurations sharing them, whichever worker runs first
+instance_cache = InstanceCache('./planner/times_collecting/instances')
+
+
+# runs in a worker process: the solver is capped to the given number of threads, so that workers do not compete for cores
+def run_configuration(configuration, threads):
+    planner = create_planner(configuration)
+    if not isinstance(planner, GreedyPlanner):
+        planner.solver.options['threads'] = threads
+
+    data_descriptor = DataDescriptor(patients=configuration["size"],
+                                     days=configuration["days"],
+                                     anesthetists=configuration["anesthetists"],
+                                     infection_frequency=configuration["covid"],
+                                     anesthesia_frequency=configuration["anesthesia"],
+                                     specialty_frequency=configuration["specialty_frequency"],
+                                     robustness_parameter=configuration["robustness"])
+
+    dataDictionary = instance_cache.get(configuration["seed"], data_descriptor)
+    t = time.time()
+    planner.solve_model(dataDictionary)
+    run_info = extract_run_info(planner)
+    elapsed = (time.time() - t)
+    return configuration, run_info, elapsed
+
+
+def make_grid(planners, solvers, size, covid, anesthesia, anesthetists, robustness_parameter, time_limit=290, gap=1e-06, iterations_cap=30, days=5, specialty_frequency=[0.83, 0.17], seed=52876, packing_strategy="best fit", anesthetist_assignment_strategy="WIS"):
+    return [{"planner": planner,
+             "solver": solver,
+             "size": s,
+             "covid": c,
+             "anesthesia": a,
+             "anesthetists": at,
+             "robustness": robustness,
+             "time_limit": time_limit,
+             "gap": gap,
+             "iterations_cap": iterations_cap,
+             "days": days,
+             "specialty_frequency": specialty_frequency,
+             "seed": seed,
+             "packing_strategy": packing_strategy,
+             "anesthetist_assignment_strategy": anesthetist_assignment_strategy}
+            for (planner, solver, robustness, s, c, a, at) in itertools.product(planners, solvers, robustness_parameter, size, covid, anesthesia, anesthetists)]
+
+
+class ResultsStore:
+    """SQLite table with one row per configuration: the configuration and its run info are stored as JSON."""
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS runs ("
+                                "key TEXT PRIMARY KEY, "
+                                "planner TEXT, "
+                                "configuration TEXT, "
+                                "run_info TEXT, "
+                                "total_run_time REAL)")
+        self.connection.commit()
+
+    def configuration_key(self, configuration):
+        return json.dumps(configuration, sort_keys=True)
+
+    def stored_keys(self):
+        return {row[0] for row in self.connection.execute("SELECT key FROM runs")}
+
+    def store(self, configuration, run_info, total_run_time):
+        self.connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)",
+                                (self.configuration_key(configuration),
+                                 configuration["planner"],
+                                 json.dumps(configuration, sort_keys=True),
+                                 json.dumps(run_info, default=str),
+                                 total_run_time))
+        # commit after each run: a crash loses at most the runs still in progress
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+
+def run_grid(configurations, results_path, workers, threads):
+    store = ResultsStore(results_path)
+    stored_keys = store.stored_keys()
+    pending = [configuration for configuration in configurations if store.configuration_key(configuration) not in stored_keys]
+    print(str(len(configurations) - len(pending)) + " configurations already stored, " + str(len(pending)) + " to run.")
+
+    # a failed configuration is reported and left unstored, so that the next run retries it; the others go on
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_configuration, configuration, threads): configuration for configuration in pending}
+        for future in as_completed(futures):
+            try:
+                configuration, run_info, elapsed = future.result()
+            except Exception as exception:
+                failed.append(futures[future])
+                print("Failed " + store.configuration_key(futures[future]) + ": " + repr(exception))
+                continue
+            store.store(configuration, run_info, elapsed)
+            print("Stored " + store.configuration_key(configuration) + " (" + str(round(elapsed, 2)) + "s)")
+    store.close()
+    print(str(len(failed)) + " configurations failed.")
+    return failed
+
+
+if __name__ == '__main__':
+    workers = int(sys.argv[1])
+    threads = int(sys.argv[2])
+
+    configurations = make_grid(planners=["heuristic_LBBD", "vanilla_LBBD"],
+                               solvers=["cplex"],
+                               size=[100, 150, 200],
+                               covid=[0.25],
+                               anesthesia=[0.2, 0.5, 0.8],
+                               anesthetists=[1, 2],
+                               robustness_parameter=[0, 2, 3, 5])
+
+    run_grid(configurations, './planner/times_collecting/times/runs.sqlite', workers, threads)
@@ -3,7 +3,8 @@ import sys
 import time
 from planner import HeuristicLBBDPlanner, VanillaLBBDPlanner
 from planner.utils import SolutionVisualizer
-from planner.data_maker import DataDescriptor, DataMaker
+from planner.data_maker import DataDescriptor
+from planner.instance_cache import InstanceCache
 
 variant = sys.argv[1] == "True"
 max_iterations = int(sys.argv[2])
@@ -15,6 +16,8 @@ anesthesia = [0.2, 0.5, 0.8]
 anesthetists = [1, 2]
 robustness_parameter = [0, 2, 3, 5]
 
+instance_cache = InstanceCache('./planner/times_collecting/instances')
+
 logging.basicConfig(filename='./planner/times_collecting/times/vanilla_LBBD_times.log', encoding='utf-8', level=logging.INFO)
 logging.info("Solver\tSize\tRobustness\tCovid\tAnesthesia\tAnesthetists\tcumulated_building_time\tTotal_run_time\tSolver_time\tStatus_OK\tObjective_Function_Value\tGap\tMP_Time_Limit_Hit\tSP_Time_Limit_Hit\tIterations\tSpecialty_1_OR_usage\tSpecialty_2_OR_usage\tSpecialty_1_selected_ratio\tSpecialty_2_selected_ratio\tgenerated_constraints\tdiscarded_constraints\tdiscarded_constraints_ratio")
 
@@ -38,8 +41,7 @@ for solver in solvers:
                                                         specialty_frequency=[0.83, 0.17],
                                                         robustness_parameter=robustness)
 
-                        dataMaker = DataMaker(seed=52876, data_descriptor=data_descriptor)
-                        dataDictionary = dataMaker.create_data_dictionary()
+                        dataDictionary = instance_cache.get(52876, data_descriptor)
                         t = time.time()
                         # dataMaker.print_data(dataDictionary)
                         planner.solve_model(dataDictionary)
@@ -3,7 +3,8 @@ import sys
 import time
 from planner import SimplePlanner
 from planner.utils import SolutionVisualizer
-from planner.data_maker import DataDescriptor, DataMaker
+from planner.data_maker import DataDescriptor
+from planner.instance_cache import InstanceCache
 
 solvers = ["cplex"]
 size = [100, 150, 200]
@@ -12,6 +13,8 @@ anesthesia = [0.2, 0.5, 0.8]
 anesthetists = [1, 2]
 robustness_parameter = [0, 2, 3, 5]
 
+instance_cache = InstanceCache('./planner/times_collecting/instances')
+
 logging.basicConfig(filename='./planner/times_collecting/times/vanilla_times.log', encoding='utf-8', level=logging.INFO)
 logging.info("Solver\tSize\tRobustness\tCovid\tAnesthesia\tAnesthetists\tBuilding_time\tRun_time\tSolverTime\tStatus_OK\tObjective_Function_Value\tTime_Limit_Hit\tUpper_bound\tGap\tspecialty_1_OR_utilization\tspecialty_2_OR_utilization\tspecialty_1_selection_ratio\tspecialty_2_selection_ratio\tgenerated_constraints\tdiscarded_constraints\tdiscarded_constraints_ratio")
 
@@ -34,8 +37,7 @@ for solver in solvers:
                                                         specialty_frequency=[0.83, 0.17],
                                                         robustness_parameter=robustness)
 
-                        dataMaker = DataMaker(seed=52876, data_descriptor=data_descriptor)
-                        dataDictionary = dataMaker.create_data_dictionary()
+                        dataDictionary = instance_cache.get(52876, data_descriptor)
                         t = time.time()
                         # dataMaker.print_data(dataDictionary)
                         planner.solve_model(dataDictionary)
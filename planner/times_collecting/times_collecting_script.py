@@ -8,4 +8,6 @@ if __name__ == '__main__':
     # LBBD (heuristic rule)
     os.system("python -m planner.times_collecting.main_LBBD True 30")
     # LBBD (Vanilla)
-    # os.system("python -m planner.times_collecting.main_LBBD False 30")
\ No newline at end of file
+    # os.system("python -m planner.times_collecting.main_LBBD False 30")
+    # whole grid, resumable, over a process pool (workers, solver threads per worker)
+    # os.system("python -m planner.times_collecting.grid_runner 4 2")
\ No newline at end of file